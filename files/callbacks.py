@@ -5,6 +5,44 @@ from stable_baselines3.common.logger import Image
 import numpy as np
 import torch as th
 
+from game_state import CompactState
+
+
+def episode_stats(info: dict) -> dict:
+    """
+    종료 스텝의 info에서 로그/최고 기록용 통계를 뽑습니다.
+    PokemonGoldEnv의 info_mode가 full/episode_end/compact(전체 상태 dict), summary(스칼라), 
+    compact 레코드만 있는 경우 모두 같은 키로 돌려줍니다.
+    """
+    if 'location' not in info and 'compact_state' in info:
+        info = CompactState(info['compact_state']).to_state_dict()
+    if 'location' in info:
+        location = info.get('location', {})
+        player_info = info.get('player_info', {})
+        return {
+            'map_bank': location.get('map_bank', 0),
+            'map_id': location.get('map_id', 0),
+            'pos_x': location.get('x_coord', 0),
+            'pos_y': location.get('y_coord', 0),
+            'party_level_sum': info.get('party_info', {}).get('party_level_sum', 0),
+            'badges': player_info.get('johto_badges_count', 0),
+            'money': player_info.get('money', 0),
+            'events_completed': sum(info.get('event_statuses', {}).values()),
+            'is_in_battle': info.get('is_in_battle', False),
+        }
+    return {
+        'map_bank': info.get('map_bank', 0),
+        'map_id': info.get('map_id', 0),
+        'pos_x': info.get('x_coord', 0),
+        'pos_y': info.get('y_coord', 0),
+        'party_level_sum': info.get('party_level_sum', 0),
+        'badges': info.get('johto_badges_count', 0),
+        'money': info.get('money', 0),
+        'events_completed': info.get('events_completed', 0),
+        'is_in_battle': info.get('is_in_battle', False),
+    }
+
+
 class EpisodeLogCallback(BaseCallback):
     def __init__(self, log_path: str, verbose=0):
         super(EpisodeLogCallback, self).__init__(verbose)
@@ -26,20 +64,21 @@ class EpisodeLogCallback(BaseCallback):
                 
                 # 종료된 환경의 정보(info) 가져오기
                 info = self.locals['infos'][i]
+                stats = episode_stats(info)
                 
                 # 로그 데이터 정리
                 log_data = {
                     'episode': self.episode_num,
                     'total_steps': self.num_timesteps,
                     'episode_reward': info.get('episode', {}).get('r', 0),
-                    'map_bank': info.get('location', {}).get('map_bank', 0),
-                    'map_id': info.get('location', {}).get('map_id', 0),
-                    'pos_x': info.get('location', {}).get('x_coord', 0),
-                    'pos_y': info.get('location', {}).get('y_coord', 0),
-                    'party_level_sum': info.get('party_info', {}).get('party_level_sum', 0),
-                    'badges': info.get('player_info', {}).get('johto_badges_count', 0),
-                    'money': info.get('player_info', {}).get('money', 0),
-                    'events_completed': sum(info.get('event_statuses', {}).values())
+                    'map_bank': stats['map_bank'],
+                    'map_id': stats['map_id'],
+                    'pos_x': stats['pos_x'],
+                    'pos_y': stats['pos_y'],
+                    'party_level_sum': stats['party_level_sum'],
+                    'badges': stats['badges'],
+                    'money': stats['money'],
+                    'events_completed': stats['events_completed']
                 }
                 
                 # 로그를 CSV 파일에 추가
@@ -85,13 +124,14 @@ class BestAgentCallback(BaseCallback):
         for i, done in enumerate(self.locals['dones']):
             if done:
                 info = self.locals['infos'][i]
+                stats = episode_stats(info)
                 
                 current_score = {
-                    "events_completed": sum(info.get('event_statuses', {}).values()),
+                    "events_completed": stats['events_completed'],
                     "episode_reward": info.get('episode', {}).get('r', 0),
-                    "badges": info.get('player_info', {}).get('johto_badges_count', 0),
-                    "party_level_sum": info.get('party_info', {}).get('party_level_sum', 0),
-                    "money": info.get('player_info', {}).get('money', 0)
+                    "badges": stats['badges'],
+                    "party_level_sum": stats['party_level_sum'],
+                    "money": stats['money']
                 }
 
                 if self._is_new_score_better(current_score):
@@ -106,7 +146,7 @@ class BestAgentCallback(BaseCallback):
                     # 현재 학습 중인 모델을 '최고 모델'로 저장
                     # self.model은 RecurrentPPO 인스턴스를 가리킴
                     # train_hierarchical.py에서 어떤 모델이 learn()을 호출했는지에 따라 저장됨
-                    if info.get('is_in_battle'):
+                    if stats['is_in_battle']:
                         self.model.save(self.battle_model_path)
                     else:
                         self.model.save(self.nav_model_path)
@@ -125,6 +165,8 @@ class ImageLogCallback(BaseCallback):
         if self.n_calls % self.frame_interval == 0:
             
             obs_dict = self.model._last_obs
+            if "image" not in obs_dict:  # obs_mode='tiles'에는 화면 이미지가 없음
+                return True
           
             image_batch = obs_dict["image"]
        
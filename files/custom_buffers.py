@@ -0,0 +1,121 @@
+# custom_buffers.py
+import numpy as np
+from gymnasium import spaces
+
+from sb3_contrib.common.recurrent.buffers import RecurrentDictRolloutBuffer
+
+class FrameDedupRecurrentDictRolloutBuffer(RecurrentDictRolloutBuffer):
+    """
+    VecDictFrameStack으로 쌓은 관측 키(stacked_key)를 프레임 단위로 한 번만 저장하는 RecurrentPPO 롤아웃 버퍼.
+
+    연속된 스택은 n_stack - 1 프레임을 공유하므로, 스텝마다 (직전 스택이 한 칸 밀린 것인지 확인한 뒤) 새 프레임 하나만
+    frame_store에 넣고 스택은 프레임 인덱스 (buffer_size, n_envs, n_stack)로 기억합니다. 미니배치를 만들 때 인덱스로 스택을 다시 조립합니다.
+    collapse_duplicates=True면 직전 프레임과 똑같은 프레임(대사 창, 정지 화면)도 새로 저장하지 않습니다.
+    frame_store의 0번은 0으로 채운 프레임이며, 시퀀스 패딩 위치에 쓰입니다. (기본 버퍼의 0 패딩과 같은 결과)
+    """
+    def __init__(self, buffer_size: int, observation_space: spaces.Dict, action_space: spaces.Space,
+                 hidden_state_shape: tuple, device="auto", gae_lambda: float = 1, gamma: float = 0.99,
+                 n_envs: int = 1, stacked_key: str = "image", n_stack: int = 4, collapse_duplicates: bool = False):
+        self.stacked_key = stacked_key
+        self.n_stack = n_stack
+        self.collapse_duplicates = collapse_duplicates
+        stacked_shape = observation_space[stacked_key].shape
+        self.frame_shape = (stacked_shape[0] // n_stack, *stacked_shape[1:])
+        self.frame_store = None
+        super().__init__(buffer_size, observation_space, action_space, hidden_state_shape, device,
+                         gae_lambda=gae_lambda, gamma=gamma, n_envs=n_envs)
+
+    def reset(self):
+        # 부모 클래스가 스택 키의 (buffer_size, n_envs, n_stack * C, H, W) 배열을 만들지 않도록 잠시 뺍니다.
+        stacked_shape = self.obs_shape.pop(self.stacked_key)
+        try:
+            super().reset()
+        finally:
+            self.obs_shape[self.stacked_key] = stacked_shape
+        # 스택마다 새 프레임 하나 + 에피소드 시작마다 n_stack - 1개 정도이므로, 부족하면 늘립니다.
+        capacity = 1 + self.buffer_size * self.n_envs + self.n_envs * self.n_stack
+        if self.frame_store is None or len(self.frame_store) < capacity:
+            self.frame_store = np.zeros((capacity, *self.frame_shape), dtype=self.observation_space[self.stacked_key].dtype)
+        else:
+            self.frame_store[0] = 0
+        self.frames_stored = 1
+        self.frame_index = np.zeros((self.buffer_size, self.n_envs, self.n_stack), dtype=np.int32)
+        self._flat_frame_index = None
+        self._last_indices = [None] * self.n_envs
+
+    def add(self, obs, *args, **kwargs) -> None:
+        stacks = np.asarray(obs[self.stacked_key]).reshape(self.n_envs, self.n_stack, *self.frame_shape)
+        for env in range(self.n_envs):
+            self.frame_index[self.pos, env] = self._store_stack(env, stacks[env])
+        super().add(obs, *args, **kwargs)
+
+    def _store_stack(self, env: int, stack: np.ndarray) -> np.ndarray:
+        """스택의 프레임 인덱스를 반환합니다. 직전 스택에서 한 칸 밀린 것이면 새 프레임만 저장합니다."""
+        previous = self._last_indices[env]
+        store = self.frame_store
+        if previous is not None and all(np.array_equal(stack[j], store[previous[j + 1]]) for j in range(self.n_stack - 1)):
+            indices = np.empty(self.n_stack, dtype=np.int32)
+            indices[:-1] = previous[1:]
+            indices[-1] = self._store_frame(stack[-1], previous[-1])
+        else:
+            # 첫 스텝이거나 에피소드가 새로 시작되어 스택이 다시 채워진 경우
+            indices = np.empty(self.n_stack, dtype=np.int32)
+            last = None
+            for j in range(self.n_stack):
+                last = indices[j] = self._store_frame(stack[j], last)
+        self._last_indices[env] = indices
+        return indices
+
+    def _store_frame(self, frame: np.ndarray, previous: int = None) -> int:
+        if self.collapse_duplicates and previous is not None and np.array_equal(frame, self.frame_store[previous]):
+            return previous
+        if self.frames_stored == len(self.frame_store):
+            grown = np.zeros((len(self.frame_store) + len(self.frame_store) // 4 + self.n_stack, *self.frame_shape),
+                             dtype=self.frame_store.dtype)
+            grown[:self.frames_stored] = self.frame_store
+            self.frame_store = grown
+        index = self.frames_stored
+        self.frame_store[index] = frame
+        self.frames_stored += 1
+        return index
+
+    def _get_samples(self, batch_inds: np.ndarray, env_change: np.ndarray, env=None):
+        samples = super()._get_samples(batch_inds, env_change, env)
+        if self._flat_frame_index is None:
+            self._flat_frame_index = self.swap_and_flatten(self.frame_index)
+        # 부모와 같은 시퀀스 패딩을 인덱스에 적용 (패딩 위치는 0 -> 0으로 채운 프레임)
+        padded = self.pad(self._flat_frame_index[batch_inds]).cpu().numpy()
+        frames = self.frame_store[padded]                               # (n_seq, max_len, n_stack, C, H, W)
+        samples.observations[self.stacked_key] = self.to_torch(
+            frames.reshape((-1, *self.obs_shape[self.stacked_key])))
+        return samples
+
+    def memory_usage(self) -> dict:
+        """스택 키 저장에 쓰인 바이트 수와 기본 버퍼 대비 비율"""
+        frame_bytes = int(np.prod(self.frame_shape)) * self.frame_store.itemsize
+        used = self.frames_stored * frame_bytes + self.frame_index.nbytes
+        full = self.buffer_size * self.n_envs * self.n_stack * frame_bytes
+        return {'frames_stored': self.frames_stored, 'bytes': used, 'ratio': full / used}
+
+
+def use_frame_dedup_buffer(model, stacked_key: str, n_stack: int, collapse_duplicates: bool = False):
+    """
+    RecurrentPPO 모델의 롤아웃 버퍼를 FrameDedupRecurrentDictRolloutBuffer로 바꿉니다. (생성/로드 직후 호출)
+    RecurrentPPO는 버퍼 클래스를 고정해서 만들므로 같은 설정으로 다시 만들어 교체합니다.
+    (기존 버퍼는 np.zeros로 만들어져 있어 한 번도 쓰지 않은 메모리는 실제로 점유하지 않습니다.)
+    """
+    old = model.rollout_buffer
+    model.rollout_buffer = FrameDedupRecurrentDictRolloutBuffer(
+        old.buffer_size,
+        old.observation_space,
+        old.action_space,
+        old.hidden_state_shape,
+        old.device,
+        gae_lambda=old.gae_lambda,
+        gamma=old.gamma,
+        n_envs=old.n_envs,
+        stacked_key=stacked_key,
+        n_stack=n_stack,
+        collapse_duplicates=collapse_duplicates,
+    )
+    return model
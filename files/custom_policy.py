@@ -27,21 +27,45 @@ class NatureCNN(BaseFeaturesExtractor):
     def forward(self, observations: torch.Tensor) -> torch.Tensor:
         return self.linear(self.cnn(observations))
 
+EXPLORED_FEATURES_DIM = 128
+
+class ExploredMapCNN(nn.Module):
+    """전역 탐험 캔버스 (1, H, W)용 작은 CNN (방문 여부만 있는 희소한 이미지라 얕게 둡니다.)"""
+    def __init__(self, observation_space: spaces.Box, features_dim: int = EXPLORED_FEATURES_DIM):
+        super().__init__()
+        n_input_channels = observation_space.shape[0]
+        self.cnn = nn.Sequential(
+            nn.Conv2d(n_input_channels, 16, kernel_size=4, stride=2, padding=1),
+            nn.ReLU(),
+            nn.Conv2d(16, 32, kernel_size=4, stride=2, padding=1),
+            nn.ReLU(),
+            nn.Flatten(),
+        )
+        with torch.no_grad():
+            n_flatten = self.cnn(torch.zeros(1, *observation_space.shape)).shape[1]
+        self.linear = nn.Sequential(nn.Linear(n_flatten, features_dim), nn.ReLU())
+
+    def forward(self, observations: torch.Tensor) -> torch.Tensor:
+        return self.linear(self.cnn(observations))
+
 class CombinedExtractor(BaseFeaturesExtractor):
     """
     Dict 관측 공간을 처리하기 위한 특징 추출기.
     이미지는 CNN으로, 상태 벡터는 MLP로 처리한 뒤 결과를 합칩니다.
+    전역 탐험 캔버스("explored")가 있으면 별도의 CNN으로 처리해 함께 합칩니다.
     """
     def __init__(self, observation_space: spaces.Dict):
         # 합쳐진 특징 벡터의 최종 차원을 계산합니다.
         cnn_output_dim = 512
         mlp_output_dim = 64
-        total_features_dim = cnn_output_dim + mlp_output_dim
+        has_explored = "explored" in observation_space.spaces
+        total_features_dim = cnn_output_dim + mlp_output_dim + (EXPLORED_FEATURES_DIM if has_explored else 0)
         
         super().__init__(observation_space, features_dim=total_features_dim)
 
         # 각 관측 공간에 맞는 추출기를 생성합니다.
         self.cnn = NatureCNN(observation_space["image"], features_dim=cnn_output_dim)
+        self.explored_cnn = ExploredMapCNN(observation_space["explored"]) if has_explored else None
         
         state_space_shape = observation_space["state"].shape[0]
         self.mlp = nn.Sequential(
@@ -57,4 +81,64 @@ class CombinedExtractor(BaseFeaturesExtractor):
         state_features = self.mlp(observations["state"])
         
         # 두 특징 벡터를 하나로 합쳐서 반환합니다.
-        return torch.cat([image_features, state_features], dim=1)
\ No newline at end of file
+        if self.explored_cnn is None:
+            return torch.cat([image_features, state_features], dim=1)
+        explored_features = self.explored_cnn(observations["explored"])
+        return torch.cat([image_features, state_features, explored_features], dim=1)
+
+class TileMapExtractor(BaseFeaturesExtractor):
+    """
+    obs_mode='tiles'용 특징 추출기.
+    타일 ID 격자(프레임 스택 포함 (S, 18, 20))는 임베딩 후 작은 CNN으로, OAM 스프라이트 테이블과 상태 벡터는 MLP로 처리합니다.
+    SB3는 uint8 (C, H, W) Box를 이미지로 보고 255로 나누므로(normalize_images=True), 타일 ID는 다시 정수로 되돌립니다.
+    """
+    def __init__(self, observation_space: spaces.Dict, tile_embed_dim: int = 8,
+                 normalized_images: bool = True):
+        cnn_output_dim = 256
+        sprite_output_dim = 64
+        mlp_output_dim = 64
+        has_explored = "explored" in observation_space.spaces
+        super().__init__(observation_space, features_dim=cnn_output_dim + sprite_output_dim + mlp_output_dim
+                         + (EXPLORED_FEATURES_DIM if has_explored else 0))
+
+        self.normalized_images = normalized_images
+        n_stack, rows, cols = observation_space["tiles"].shape
+        self.tile_embedding = nn.Embedding(256, tile_embed_dim)
+        self.cnn = nn.Sequential(
+            nn.Conv2d(n_stack * tile_embed_dim, 32, kernel_size=3, stride=1, padding=1),
+            nn.ReLU(),
+            nn.Conv2d(32, 64, kernel_size=3, stride=2, padding=1),
+            nn.ReLU(),
+            nn.Flatten(),
+        )
+        with torch.no_grad():
+            n_flatten = self.cnn(torch.zeros(1, n_stack * tile_embed_dim, rows, cols)).shape[1]
+        self.cnn_linear = nn.Sequential(nn.Linear(n_flatten, cnn_output_dim), nn.ReLU())
+
+        n_sprite_inputs = int(torch.tensor(observation_space["sprites"].shape).prod())
+        self.sprite_mlp = nn.Sequential(nn.Linear(n_sprite_inputs, sprite_output_dim), nn.ReLU())
+
+        state_space_shape = observation_space["state"].shape[0]
+        self.mlp = nn.Sequential(
+            nn.Linear(state_space_shape, 128),
+            nn.ReLU(),
+            nn.Linear(128, mlp_output_dim),
+            nn.ReLU(),
+        )
+        self.explored_cnn = ExploredMapCNN(observation_space["explored"]) if has_explored else None
+
+    def forward(self, observations: Dict[str, torch.Tensor]) -> torch.Tensor:
+        tiles = observations["tiles"]
+        if self.normalized_images:
+            tiles = tiles * 255.0
+        tile_ids = tiles.round().long().clamp_(0, 255)                # (B, S, H, W)
+        embedded = self.tile_embedding(tile_ids)                       # (B, S, H, W, E)
+        embedded = embedded.permute(0, 1, 4, 2, 3).flatten(1, 2)       # (B, S*E, H, W)
+        tile_features = self.cnn_linear(self.cnn(embedded))
+
+        sprite_features = self.sprite_mlp(observations["sprites"].flatten(1) / 255.0)
+        state_features = self.mlp(observations["state"])
+        features = [tile_features, sprite_features, state_features]
+        if self.explored_cnn is not None:
+            features.append(self.explored_cnn(observations["explored"]))
+        return torch.cat(features, dim=1)
@@ -1,81 +1,102 @@
 import numpy as np
 from gymnasium import spaces
 from stable_baselines3.common.vec_env.base_vec_env import VecEnv, VecEnvWrapper
-from collections import deque
 
 class VecDictFrameStack(VecEnvWrapper):
+    """
+    Dict 관측의 한 키(dict_obs_key)만 채널 방향으로 n_stack 프레임 쌓는 래퍼.
+
+    미리 할당한 (환경 수, 3 * n_stack, C, H, W) 프레임 버퍼에 스텝마다 최신 프레임 하나만 쓰고,
+    연속된 최근 n_stack 프레임 구간을 (환경 수, n_stack * C, H, W) 뷰로 돌려줍니다. (스택 비용이 n_stack과 무관)
+    모든 환경이 함께 진행하므로 쓰기 위치 하나를 공유합니다. 버퍼 끝에 닿거나 어떤 환경이 끝나면
+    마지막 n_stack - 1 프레임을 직전 반환 구간과 겹치지 않는 곳으로 옮긴 뒤 이어서 씁니다.
+
+    step_wait()가 반환한 스택 관측은 프레임 버퍼의 뷰이며, 다음 스텝까지만 유효합니다. 다음 step_wait()는 이 구간과
+    겹치지 않게 쓰므로 그 직후까지는 값이 유지되고(SB3는 이때 롤아웃 버퍼로 복사함), 그 다음 스텝부터는 덮어써집니다.
+    더 오래 보관하려면(예: 같은 환경을 번갈아 쓰는 여러 모델의 _last_obs) 복사해야 합니다. reset()은 복사본을 반환합니다.
+    """
     def __init__(self, venv: VecEnv, n_stack: int, dict_obs_key: str):
         self.venv = venv
         self.n_stack = n_stack
         self.dict_obs_key = dict_obs_key
-        self.stacked_obs = None
 
         # 관측 공간(observation space)을 수정합니다.
         # 기존 딕셔너리 공간을 복사한 뒤, 스택을 적용할 키의 공간만 모양(shape)을 바꿔줍니다.
         wrapped_obs_space = venv.observation_space
         self.original_image_space = wrapped_obs_space.spaces[self.dict_obs_key]
-        
+
         # 채널(channel) 차원을 맨 앞으로 가정 (CHW 포맷)
         low = np.repeat(self.original_image_space.low, self.n_stack, axis=0)
         high = np.repeat(self.original_image_space.high, self.n_stack, axis=0)
-        
+
         # 새로운 이미지 공간 생성
         stacked_image_space = spaces.Box(
             low=low, high=high, dtype=self.original_image_space.dtype
         )
-        
+
         # 전체 관측 공간 업데이트
         new_spaces = {k: v for k, v in wrapped_obs_space.spaces.items()}
         new_spaces[self.dict_obs_key] = stacked_image_space
-        
+
         super().__init__(venv, observation_space=spaces.Dict(new_spaces))
 
-        # 환경별 프레임 버퍼를 초기화합니다.
-        self.buffers = [deque([], maxlen=self.n_stack) for _ in range(self.num_envs)]
+        # 환경별 프레임 버퍼 (재사용). 현재 스택은 [_head - n_stack, _head) 구간입니다.
+        self._frames = np.zeros((self.num_envs, 3 * n_stack, *self.original_image_space.shape),
+                                dtype=self.original_image_space.dtype)
+        self._head = n_stack
 
-    def _get_stacked_obs(self):
-        # 버퍼에서 프레임들을 가져와 하나의 numpy 배열로 합칩니다.
-        # 각 버퍼를 리스트로 변환한 뒤 numpy 배열로 만듭니다.
-        stacked_images = np.array([list(buf) for buf in self.buffers])
-        
-        # (환경 수, 스택 수, 채널, 높이, 너비) -> (환경 수, 스택*채널, 높이, 너비)
+    def _get_stacked_obs(self) -> np.ndarray:
+        # (환경 수, 스택 수, 채널, 높이, 너비) 구간 -> (환경 수, 스택*채널, 높이, 너비) 뷰
         # 예: (4, 4, 1, 144, 160) -> (4, 4, 144, 160)
-        b, s, c, h, w = stacked_images.shape
-        return stacked_images.reshape(b, s * c, h, w)
+        window = self._frames[:, self._head - self.n_stack:self._head]
+        b, s, c, h, w = window.shape
+        return window.reshape(b, s * c, h, w)
+
+    def _relocate(self):
+        """마지막 n_stack - 1 프레임을 직전 스택 구간과 겹치지 않는 위치로 옮깁니다."""
+        n, head = self.n_stack, self._head
+        start = head if head + n <= self._frames.shape[1] else 0
+        self._frames[:, start:start + n - 1] = self._frames[:, head - n + 1:head]
+        self._head = start + n - 1
 
     def _process_obs(self, obs):
         """딕셔너리 관측을 받아 스택된 버전으로 교체합니다."""
-        stacked_images = self._get_stacked_obs()
         # 원본 딕셔너리에서 이미지 부분만 스택된 이미지로 교체합니다.
-        obs[self.dict_obs_key] = stacked_images
+        obs[self.dict_obs_key] = self._get_stacked_obs()
         return obs
 
     def step_wait(self):
         obs, rewards, dones, infos = self.venv.step_wait()
-        
-        for i in range(self.num_envs):
-            # 에피소드가 끝나면(done), 버퍼를 초기 프레임으로 다시 채웁니다.
-            if dones[i]:
-                self.buffers[i].clear()
-                # VecEnv는 자동으로 리셋하므로, infos에서 'terminal_observation'을 가져옵니다.
-                terminal_obs_image = infos[i]['terminal_observation'][self.dict_obs_key]
-                for _ in range(self.n_stack):
-                    self.buffers[i].append(terminal_obs_image)
-            else:
-                self.buffers[i].append(obs[self.dict_obs_key][i])
-        
+
+        if self._head == self._frames.shape[1] or dones.any():
+            self._relocate()
+        head = self._head
+        self._frames[:, head] = obs[self.dict_obs_key]
+        self._head = head + 1
+
+        for i in np.flatnonzero(dones):
+            # VecEnv는 자동으로 리셋하므로 obs는 이미 새 에피소드의 첫 프레임입니다.
+            # infos의 'terminal_observation'은 이전 프레임들과 쌓아 관측 공간과 같은 모양으로 바꿉니다. (SB3 VecFrameStack과 동일)
+            terminal_obs = infos[i].get('terminal_observation')
+            if terminal_obs is not None:
+                previous = self._frames[i, head - self.n_stack + 1:head]
+                terminal_obs[self.dict_obs_key] = np.concatenate(
+                    [previous, terminal_obs[self.dict_obs_key][None]]).reshape(self.observation_space[self.dict_obs_key].shape)
+            # 새 에피소드의 스택은 첫 프레임으로 가득 채웁니다.
+            self._frames[i, head + 1 - self.n_stack:head + 1] = obs[self.dict_obs_key][i]
+
         return self._process_obs(obs), rewards, dones, infos
 
     def reset(self):
         obs = self.venv.reset()
-        # 리셋 시, 모든 버퍼를 첫 번째 프레임으로 가득 채웁니다.
-        initial_images = obs[self.dict_obs_key]
-        for i in range(self.num_envs):
-            self.buffers[i].clear()
-            for _ in range(self.n_stack):
-                self.buffers[i].append(initial_images[i])
-        
-        return self._process_obs(obs)
+        # 리셋 시, 모든 스택을 첫 번째 프레임으로 가득 채웁니다.
+        self._head = self.n_stack
+        self._frames[:, :self.n_stack] = obs[self.dict_obs_key][:, None]
+        # 리셋 관측은 모델이 learn() 사이에 보관할 수 있으므로 뷰 대신 복사본을 돌려줍니다.
+        obs = self._process_obs(obs)
+        obs[self.dict_obs_key] = obs[self.dict_obs_key].copy()
+        return obs
 
     def close(self):
-        self.venv.close()
\ No newline at end of file
+        self.venv.close()
+
@@ -0,0 +1,141 @@
+# exploration.py
+"""
+탐험 기록 저장소. 방문한 맵마다 256x256 uint8 격자를 (처음 방문할 때) 할당하고
+(bank, map_id, x, y) 방문 여부를 할당 없이 O(1)로 확인/기록합니다.
+격자는 bytearray라서 원소 접근이 NumPy 스칼라 인덱싱보다 훨씬 빠르고, map_grid()로 NumPy 뷰를 얻을 수 있습니다.
+"""
+import numpy as np
+
+GRID_SIZE = 256     # 맵 좌표는 1바이트이므로 256x256 격자 하나로 맵 전체를 덮습니다.
+
+# visit() 반환 플래그
+NEW_TILE = 1
+NEW_MAP = 2
+
+_EMPTY_GRID = bytes(GRID_SIZE * GRID_SIZE)
+
+GLOBAL_MAP_MARGIN = 64  # 전역 캔버스 배율 계산 때 맵 원점 너머로 잡는 여유 (맵 크기를 모르므로 대략)
+
+
+class ExplorationMap:
+    """
+    맵별 방문 격자. 맵 번호(bank * 256 + map_id) -> 격자 슬롯 표를 평탄한 리스트로 두고,
+    리셋 때는 사용한 격자만 0으로 채워 풀에 되돌립니다. (다음 에피소드에서 재사용)
+    """
+    def __init__(self):
+        self._slots = [-1] * (GRID_SIZE * GRID_SIZE)   # 맵 번호 -> 격자 인덱스
+        self._grids = []        # 할당된 격자 풀 (재사용)
+        self._used = []         # 이번 에피소드에 격자를 받은 맵 번호 (슬롯 순서)
+        self.tiles_seen = 0
+        self.maps_seen = 0
+
+    def reset(self):
+        """방문 기록을 지웁니다. 격자는 해제하지 않고 0으로 채워 재사용합니다."""
+        for slot, map_index in enumerate(self._used):
+            self._grids[slot][:] = _EMPTY_GRID
+            self._slots[map_index] = -1
+        self._used.clear()
+        self.tiles_seen = 0
+        self.maps_seen = 0
+
+    def visit(self, bank: int, map_id: int, x: int, y: int) -> int:
+        """
+        (x, y)를 방문으로 기록하고 새로 본 것을 NEW_TILE | NEW_MAP 플래그로 반환합니다.
+        처음 방문한 맵은 NEW_MAP과 NEW_TILE이 함께 설정됩니다.
+        """
+        map_index = bank * GRID_SIZE + map_id
+        slot = self._slots[map_index]
+        flags = 0
+        if slot < 0:
+            slot = self._allocate(map_index)
+            flags = NEW_MAP
+        grid = self._grids[slot]
+        offset = y * GRID_SIZE + x
+        if grid[offset]:
+            return flags
+        grid[offset] = 1
+        self.tiles_seen += 1
+        return flags | NEW_TILE
+
+    def seen(self, bank: int, map_id: int, x: int, y: int) -> bool:
+        """(x, y)를 방문한 적이 있는지"""
+        slot = self._slots[bank * GRID_SIZE + map_id]
+        return slot >= 0 and bool(self._grids[slot][y * GRID_SIZE + x])
+
+    def map_grid(self, bank: int, map_id: int):
+        """맵의 방문 격자 (GRID_SIZE, GRID_SIZE) uint8 뷰 ([y, x]). 방문하지 않은 맵이면 None"""
+        slot = self._slots[bank * GRID_SIZE + map_id]
+        if slot < 0:
+            return None
+        return np.frombuffer(self._grids[slot], dtype=np.uint8).reshape(GRID_SIZE, GRID_SIZE)
+
+    def visited_maps(self) -> list[tuple[int, int]]:
+        """방문한 맵의 (bank, map_id) 목록 (방문 순서)"""
+        return [divmod(map_index, GRID_SIZE) for map_index in self._used]
+
+    def summary(self) -> dict:
+        return {'tiles_seen': self.tiles_seen, 'maps_seen': self.maps_seen}
+
+    def copy(self) -> 'ExplorationMap':
+        """사용 중인 격자만 복사한 새 저장소 (분기 탐색용 스냅샷)"""
+        other = ExplorationMap()
+        for map_index in self._used:
+            slot = other._allocate(map_index)
+            other._grids[slot][:] = self._grids[self._slots[map_index]]
+        other.tiles_seen = self.tiles_seen
+        return other
+
+    def restore_from(self, other: 'ExplorationMap'):
+        """other의 방문 기록으로 덮어씁니다. (이미 할당된 격자를 재사용)"""
+        self.reset()
+        for map_index in other._used:
+            slot = self._allocate(map_index)
+            self._grids[slot][:] = other._grids[other._slots[map_index]]
+        self.tiles_seen = other.tiles_seen
+
+    def _allocate(self, map_index: int) -> int:
+        slot = len(self._used)
+        if slot == len(self._grids):
+            self._grids.append(bytearray(GRID_SIZE * GRID_SIZE))
+        self._slots[map_index] = slot
+        self._used.append(map_index)
+        self.maps_seen += 1
+        return slot
+
+
+class GlobalExplorationCanvas:
+    """
+    방문한 타일을 전역 좌표(RomMapper.get_global_map_offsets())로 옮겨 그리는 (1, H, W) uint8 캔버스.
+    배치된 맵들이 차지하는 영역(원점 최소값 ~ 최대값 + 여유)을 H x W에 맞도록 정수 배율로 줄이고,
+    새 타일을 밟을 때 픽셀 하나만 갱신합니다. 전역 위치가 없는 맵(건물 안, 동굴)의 방문은 그리지 않습니다.
+    """
+    def __init__(self, offsets: dict, shape: tuple[int, int]):
+        height, width = shape
+        self.canvas = np.zeros((1, height, width), dtype=np.uint8)
+        # 맵 번호(bank * 256 + map_id) -> 캔버스 원점 기준 위치 (평탄한 리스트, 없으면 None)
+        self._origins = [None] * (GRID_SIZE * GRID_SIZE)
+        if offsets:
+            min_x = min(ox for ox, _ in offsets.values())
+            min_y = min(oy for _, oy in offsets.values())
+            extent_x = max(ox for ox, _ in offsets.values()) - min_x + GLOBAL_MAP_MARGIN
+            extent_y = max(oy for _, oy in offsets.values()) - min_y + GLOBAL_MAP_MARGIN
+        else:
+            min_x = min_y = 0
+            extent_x = extent_y = 1
+        for (bank, map_id), (ox, oy) in offsets.items():
+            self._origins[bank * GRID_SIZE + map_id] = (ox - min_x, oy - min_y)
+        self.scale = max(1, -(-extent_x // width), -(-extent_y // height))
+
+    def reset(self):
+        self.canvas.fill(0)
+
+    def mark(self, bank: int, map_id: int, x: int, y: int):
+        """(bank, map_id, x, y)에 해당하는 픽셀을 방문(255)으로 칠합니다."""
+        origin = self._origins[bank * GRID_SIZE + map_id]
+        if origin is None:
+            return
+        row = (origin[1] + y) // self.scale
+        col = (origin[0] + x) // self.scale
+        _, height, width = self.canvas.shape
+        if 0 <= row < height and 0 <= col < width:
+            self.canvas[0, row, col] = 255
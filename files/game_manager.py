@@ -1,18 +1,104 @@
 from pyboy import PyBoy
 from pyboy.utils import WindowEvent
+import hashlib
+import inspect
+import io
+import os
+import sys
+import time
 import numpy as np
 
+from rom_cache import rom_file_digest, cache_path, atomic_write
+from game_state import GAME_STATE_ADDRS, OPTIONS_TEXT_SPEED_MASK, OPTIONS_TEXT_SPEED_FAST, OPTIONS_BATTLE_SCENE_OFF, fast_options_value
+
+SCREEN_HEIGHT, SCREEN_WIDTH = 144, 160
+
+STABILIZE_FRAMES = 10   # 상태 로드 후 안정화를 위해 진행하는 프레임 수
+INTRO_FRAMES = 4000     # state_path가 없을 때 인트로를 넘기기 위해 진행하는 프레임 수
+SNAPSHOT_SLOTS = 32     # 메모리 스냅샷 링 크기 (가득 차면 가장 오래된 스냅샷을 덮어씀)
+
+# 타일맵 관측 (픽셀 대신 화면에 보이는 20x18 타일 ID와 OAM 스프라이트 테이블)
+TILE_ROWS, TILE_COLS = 18, 20
+OAM_START, OAM_SPRITES = 0xFE00, 40     # 스프라이트당 4바이트 (y, x, 타일 ID, 속성)
+LCDC_ADDR, SCY_ADDR, SCX_ADDR, WY_ADDR, WX_ADDR = 0xFF40, 0xFF42, 0xFF43, 0xFF4A, 0xFF4B
+
+# 입력 대기 감지: 아래 RAM 구간이 settle_frames 프레임 연속으로 그대로면 게임이 입력을 기다리는 것으로 봅니다.
+# 글자 출력, 전투 애니메이션, 맵 전환, 걷기(스크롤)는 이 값들을 바꿉니다.
+# 단, 대사는 글자 사이에 글자 속도만큼(빠름 1, 보통 3, 느림 5프레임) 멈추므로 settle_frames가 그보다 짧으면
+# 대사 도중에 멈춥니다. settle_frames=None이면 현재 옵션의 글자 지연 + 1프레임을 씁니다. (settle_frames_for_text_speed)
+INPUT_WAIT_RANGES = [
+    (0xC4A0, 0xC4A0 + TILE_ROWS * TILE_COLS),   # wTilemap: 화면 타일 버퍼 (pret/pokegold ram/wram.asm)
+    (SCY_ADDR, SCX_ADDR + 1),                   # 배경 스크롤
+    (WY_ADDR, WX_ADDR + 1),                     # 윈도우 위치
+    (0xD116, 0xD117),                           # 전투 종류
+    (0xD20D, 0xD20F),                           # 플레이어 세부 좌표
+]
+
+# 매크로 액션: 기본 액션(0-7) 뒤에 이어지는 번호로, 환경의 한 스텝 안에서 기본 동작을 여러 번 반복합니다.
+# (이름, 기본 액션, 최대 반복 횟수, 종료 조건)
+#   'walk'       : 방향키를 1타일(WALK_TILE_FRAMES 프레임)씩 누름. 막히거나 맵 이동/전투/메뉴가 열리면 중단
+#   'text_done'  : A를 누르고 입력 대기까지 진행. 눌러도 화면이 바뀌지 않으면(대사 끝) 중단
+#   'menu_closed': B를 누르고 입력 대기까지 진행. 메뉴가 닫히거나 눌러도 화면이 바뀌지 않으면 중단
+WALK_TILE_FRAMES = 16       # 걷기 1타일에 걸리는 프레임 수
+MACRO_SETTLE_FRAMES = 90    # A/B 매크로에서 버튼을 누른 뒤 입력 대기까지 기다리는 최대 프레임 수
+MACRO_ACTIONS = [
+    ('walk_up_4', 4, 4, 'walk'),
+    ('walk_down_4', 5, 4, 'walk'),
+    ('walk_left_4', 6, 4, 'walk'),
+    ('walk_right_4', 7, 4, 'walk'),
+    ('mash_a', 1, 16, 'text_done'),
+    ('close_menu', 2, 8, 'menu_closed'),
+]
+
 class GameManager:
     """
     PyBoy 에뮬레이터를 관리하고 게임 입력을 처리합니다.
     """
-    def __init__(self, rom_path: str, state_path: str = None, speed: int = 0, headless: bool = True):
+    def __init__(self, rom_path: str, state_path: str = None, speed: int = 0, headless: bool = True,
+                 turbo: bool = True, screen_downsample: int = 1, screen_crop: tuple = None,
+                 cache_stabilized_state: bool = True, fast_options: bool = False,
+                 snapshot_slots: int = SNAPSHOT_SLOTS):
         self.rom_path = rom_path
         self.state_path = state_path
+
+        # fast_options: 상태를 로드할 때마다 옵션을 글자 속도 '빠르게', 전투 애니메이션 '끄기'로 RAM에 직접 씁니다.
+        # (대사/전투 연출에 쓰이는 프레임이 줄어듭니다. 안정화 상태 캐시에도 반영된 값이 저장됩니다.)
+        self.fast_options = fast_options
+
+        # 세이브 상태 메모리 캐시: path -> {'stat', 'digest', 'data', 'stabilized'}
+        # 파일의 mtime/크기가 바뀌면 다시 읽고, 내용 해시가 같으면 안정화 상태도 그대로 씁니다.
+        self.cache_stabilized_state = cache_stabilized_state
+        self._state_cache = {}
+        self._boot_state = None     # state_path가 없을 때 쓰는 인트로 이후 상태 (ROM 해시별 파일 캐시)
+
+        # 메모리 스냅샷 링: 슬롯마다 상태 버퍼(BytesIO)와 화면 버퍼를 한 번만 만들고 덮어써서 재사용합니다.
+        # 핸들은 단조 증가하는 정수이며, 핸들 % 슬롯 수 위치에 저장됩니다.
+        self.snapshot_slots = snapshot_slots
+        self._snapshots = [None] * snapshot_slots   # slot -> {'handle', 'buffer', 'screen'}
+        self._next_snapshot = 0
         
         window = "null" if headless else "SDL2"
         self.pyboy = PyBoy(rom_path, window=window, sound=False, gameboy_tpye="CGB")
         self.pyboy.set_emulation_speed(speed)
+        self._power_on_state = self._dump_state()   # 부팅 상태 캐시를 만들 때의 시작점
+
+        # turbo: 화면 캡처에 쓰이는 마지막 프레임만 렌더링하고 중간 프레임은 렌더링을 건너뜁니다.
+        # PyBoy 2.x는 tick(count, render)로 여러 프레임을 한 번에 진행하고, 1.x는 _rendering()으로 렌더러를 끕니다.
+        self.turbo = turbo
+        self._batched_tick = self._supports_batched_tick()
+
+        # 화면 캡처: PIL을 거치지 않고 PyBoy 화면 버퍼(뷰)를 직접 읽어 미리 할당한 CHW 버퍼에 흑백으로 씁니다.
+        self._screen = getattr(self.pyboy, 'screen', None)          # PyBoy 2.x: screen.ndarray (RGBA 뷰)
+        if self._screen is None or not hasattr(self._screen, 'ndarray'):
+            self._screen = self.pyboy.botsupport_manager().screen()  # PyBoy 1.x: screen_ndarray() (버퍼 뷰)
+        self._configure_screen(screen_downsample, screen_crop)
+
+        # 타일맵 관측 버퍼 (재사용)
+        self._tile_rows = np.arange(TILE_ROWS).reshape(-1, 1)
+        self._tile_cols = np.arange(TILE_COLS).reshape(1, -1)
+        self._tiles = np.zeros((1, TILE_ROWS, TILE_COLS), dtype=np.uint8)
+        self._sprites = np.zeros((OAM_SPRITES, 4), dtype=np.uint8)
+        self._input_wait_addrs = [a for start, end in INPUT_WAIT_RANGES for a in range(start, end)]
         
         # 가능한 액션과 버튼 릴리즈 매핑
         self.action_map = {
@@ -36,54 +122,356 @@ class GameManager:
             7: WindowEvent.RELEASE_ARROW_RIGHT,
         }
 
+    def _supports_batched_tick(self) -> bool:
+        """PyBoy 2.x의 tick(count, render) 지원 여부"""
+        try:
+            return 'count' in inspect.signature(self.pyboy.tick).parameters
+        except (TypeError, ValueError):
+            return False
+
+    def tick(self, frames: int, render: bool = True):
+        """
+        frames 프레임만큼 에뮬레이터를 진행합니다.
+        turbo 모드에서는 render=True일 때 마지막 프레임만 렌더링하고, render=False면 전혀 렌더링하지 않습니다.
+        """
+        if frames <= 0:
+            return
+        if not self.turbo:
+            for _ in range(frames):
+                self.pyboy.tick()
+            return
+        if self._batched_tick:
+            self.pyboy.tick(frames, render)
+            return
+        self.pyboy._rendering(False)
+        try:
+            for _ in range(frames - 1 if render else frames):
+                self.pyboy.tick()
+        finally:
+            self.pyboy._rendering(True)
+        if render:
+            self.pyboy.tick()
+
     def reset(self):
         """환경을 초기 상태로 리셋합니다."""
         if self.state_path:
-            with open(self.state_path, "rb") as f:
-                self.pyboy.load_state(f)
-            # 상태 로드 후 안정화를 위해 몇 프레임 진행
-            for _ in range(10):
-                self.pyboy.tick()
+            self._reset_from_state(self.state_path)
         else:
-            # 초기 상태 파일이 없다면 인트로 스킵 (시간이 걸릴 수 있음)
-            for _ in range(4000):
-                self.pyboy.tick()
+            # 초기 상태 파일이 없다면 인트로 스킵 (처음 한 번만 진행하고 이후에는 캐시된 상태를 로드)
+            self._reset_from_boot()
+        if self.fast_options and not self.options_are_fast():
+            print(f"경고: 게임 옵션이 적용되지 않았습니다. (옵션 바이트: 0x{self._read_options():02X})")
+
+    def _load_state(self, data: bytes):
+        """상태를 로드하고, fast_options면 옵션 바이트를 덮어씁니다."""
+        self.pyboy.load_state(io.BytesIO(data))
+        if self.fast_options:
+            self.apply_fast_options()
+
+    def _read_options(self) -> int:
+        return self.pyboy.get_memory_value(GAME_STATE_ADDRS['options'])
+
+    def apply_fast_options(self) -> bool:
+        """옵션 바이트를 글자 속도 '빠르게', 전투 애니메이션 '끄기'로 바꾸고, 다시 읽어 적용 여부를 반환합니다."""
+        options = self._read_options()
+        target = fast_options_value(options)
+        if options != target:
+            self.pyboy.set_memory_value(GAME_STATE_ADDRS['options'], target)
+        return self._read_options() == target
+
+    def options_are_fast(self) -> bool:
+        """현재 옵션이 글자 속도 '빠르게', 전투 애니메이션 '끄기'인지 확인합니다."""
+        options = self._read_options()
+        return (options & OPTIONS_TEXT_SPEED_MASK) == OPTIONS_TEXT_SPEED_FAST and bool(options & OPTIONS_BATTLE_SCENE_OFF)
+
+    def _reset_from_boot(self):
+        """
+        전원 투입 후 INTRO_FRAMES 프레임을 진행한 상태로 리셋합니다.
+        마지막 1프레임 직전 상태를 ROM 해시를 키로 .pokemon_cache/에 저장해 두므로,
+        이후 리셋과 다른 프로세스(SubprocVecEnv 워커)는 4000프레임 대신 상태 로드 + 1프레임만 진행합니다.
+        """
+        if self._boot_state is None:
+            self._boot_state = self._load_boot_state()
+        if self._boot_state is not None:
+            self._load_state(self._boot_state)
+            self.tick(1)
+            return
+
+        # 캐시가 없으면 전원 투입 직후 상태에서 인트로를 진행하고 저장
+        self.pyboy.load_state(io.BytesIO(self._power_on_state))
+        self.tick(INTRO_FRAMES - 1, render=False)
+        self._boot_state = self._dump_state()
+        try:
+            atomic_write(self._boot_state_path(), lambda f: f.write(self._boot_state))
+        except OSError as e:
+            print(f"경고: 부팅 상태 캐시를 저장하지 못했습니다: {e}")
+        # 부팅 상태 파일은 옵션과 무관하게 공유되므로 옵션은 저장 후에 적용합니다.
+        if self.fast_options:
+            self.apply_fast_options()
+        self.tick(1)
+
+    def _boot_state_path(self) -> str:
+        return cache_path(self.rom_path, rom_file_digest(self.rom_path), f"boot_state_{INTRO_FRAMES}.state")
 
-    def step(self, action: int, frame_skip: int = 4):
+    def _load_boot_state(self):
+        path = self._boot_state_path()
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+        # PyBoy 버전이 바뀌어 상태 형식이 맞지 않으면 캐시를 버리고 다시 만듭니다.
+        snapshot = self._dump_state()
+        try:
+            self.pyboy.load_state(io.BytesIO(data))
+        except Exception as e:
+            print(f"경고: 부팅 상태 캐시를 읽지 못해 다시 생성합니다: {e}")
+            self.pyboy.load_state(io.BytesIO(snapshot))
+            return None
+        return data
+
+    def _reset_from_state(self, path: str):
+        """
+        메모리에 캐시된 세이브 상태로 리셋합니다.
+        안정화 프레임 중 마지막 1프레임을 뺀 상태도 캐시해 두고, 다음 리셋부터는 그 상태를 로드한 뒤
+        (관측용 화면을 렌더링하기 위해) 1프레임만 진행합니다. 결과는 매번 10프레임을 진행하는 것과 같습니다.
+        """
+        entry = self._get_cached_state(path)
+        stabilized = entry['stabilized']
+        if stabilized is not None:
+            self._load_state(stabilized)
+            self.tick(1)
+            return
+
+        self._load_state(entry['data'])
+        # 상태 로드 후 안정화를 위해 몇 프레임 진행
+        self.tick(STABILIZE_FRAMES - 1, render=False)
+        if self.cache_stabilized_state:
+            entry['stabilized'] = self._dump_state()
+        self.tick(1)
+
+    def _get_cached_state(self, path: str) -> dict:
+        """세이브 상태 파일을 메모리 캐시에서 가져옵니다. (파일이 바뀌었을 때만 다시 읽음)"""
+        st = os.stat(path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+        entry = self._state_cache.get(path)
+        if entry is not None and entry['stat'] == stat_key:
+            return entry
+
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        if entry is not None and entry['digest'] == digest:
+            entry['stat'] = stat_key   # 내용이 같으면 안정화 상태도 재사용
+            return entry
+
+        entry = {'stat': stat_key, 'digest': digest, 'data': data, 'stabilized': None}
+        self._state_cache[path] = entry
+        return entry
+
+    def _dump_state(self) -> bytes:
+        buffer = io.BytesIO()
+        self.pyboy.save_state(buffer)
+        return buffer.getvalue()
+
+    def step(self, action: int, frame_skip: int = 4, render: bool = True):
         """
         주어진 액션을 실행하고 지정된 프레임만큼 게임을 진행합니다.
+        render=False면 (turbo 모드에서) 마지막 프레임도 렌더링하지 않습니다. (화면을 캡처하지 않는 관측 모드용)
         """
         if self.action_map[action] is not None:
             self.pyboy.send_input(self.action_map[action])
         
-        # 버튼을 누른 상태로 몇 프레임 진행
-        for _ in range(frame_skip):
-            self.pyboy.tick()
+        # 버튼을 누른 상태로 몇 프레임 진행 (이 구간의 화면은 캡처되지 않으므로 렌더링하지 않음)
+        self.tick(frame_skip, render=False)
         
         if self.release_map[action] is not None:
             self.pyboy.send_input(self.release_map[action])
 
         # ✨ [핵심 수정] 버튼을 뗀 후, 화면이 렌더링될 시간을 주기 위해 tick을 추가합니다.
         # 이 과정을 통해 다음 화면 캡처 시 온전한 게임 화면을 얻을 수 있습니다.
-        for _ in range(frame_skip):
-            self.pyboy.tick()
+        self.tick(frame_skip, render=render)
 
-    def get_screen_image(self) -> np.ndarray:
+    def hold(self, action: int, frames: int, render: bool = True):
+        """버튼을 frames 프레임 동안 누르고 있다가 뗍니다."""
+        if self.action_map[action] is not None:
+            self.pyboy.send_input(self.action_map[action])
+        self.tick(frames, render=render)
+        if self.release_map[action] is not None:
+            self.pyboy.send_input(self.release_map[action])
+
+    def macro_step(self, action: int, until: str, frame_skip: int = 4, settle_frames: int = None,
+                   render: bool = True) -> tuple[int, bool]:
         """
-        현재 게임 화면을 흑백(Grayscale) numpy 배열로 반환합니다.
-        <<< 최종 수정: pyboy.screen.ndarray -> pyboy.screen_image() >>>
+        매크로 액션의 1회분을 진행하고 (진행한 프레임 수, 입력 대기 구간의 RAM이 바뀌었는지)를 반환합니다.
+        'walk'는 1타일만큼 방향키를 누르고, 나머지는 버튼을 누른 뒤 입력 대기 상태까지 진행합니다.
         """
-        # PIL Image 객체를 가져와서 numpy 배열로 변환
-        screen_pil = self.pyboy.screen_image() 
-        screen = np.array(screen_pil)
+        if until == 'walk':
+            self.hold(action, WALK_TILE_FRAMES, render=render)
+            return WALK_TILE_FRAMES, True
+        before = self.input_wait_signature()
+        self.step(action, frame_skip, render=False)
+        frames = 2 * frame_skip + self.fast_forward(MACRO_SETTLE_FRAMES, settle_frames, render=render)
+        return frames, self.input_wait_signature() != before
 
-        if screen.shape[2] > 1:
-            grayscale_screen = np.mean(screen[:, :, :3], axis=2).astype(np.uint8)
-        else:
-            grayscale_screen = screen.squeeze(-1)
+    def fast_forward(self, max_frames: int, settle_frames: int = None, render: bool = True) -> int:
+        """
+        입력이 무시되는 구간(대사 출력, 애니메이션, 맵 전환)을 건너뜁니다.
+        INPUT_WAIT_RANGES가 settle_frames 프레임 연속으로 바뀌지 않거나 max_frames에 닿을 때까지 진행하고,
+        진행한 프레임 수를 반환합니다. render=True면 관측용으로 마지막에 1프레임을 렌더링합니다. (프레임 수에 포함)
+        settle_frames=None이면 settle_frames_for_text_speed()를 씁니다. 직접 줄 때는 글자 지연보다 길어야 합니다.
+        """
+        if max_frames <= 0:
+            return 0
+        if settle_frames is None:
+            settle_frames = self.settle_frames_for_text_speed()
+        signature = self.input_wait_signature()
+        stable = 0
+        frames = 0
+        while frames < max_frames and stable < settle_frames:
+            self.tick(1, render=False)
+            frames += 1
+            current = self.input_wait_signature()
+            stable = stable + 1 if current == signature else 0
+            signature = current
+        if render:
+            self.tick(1)
+            frames += 1
+        return frames
+
+    def settle_frames_for_text_speed(self) -> int:
+        """현재 옵션의 글자 사이 지연보다 1프레임 긴 정지 구간 (빠름 2, 보통 4, 느림 6)"""
+        return max(2, (self._read_options() & OPTIONS_TEXT_SPEED_MASK) + 1)
+
+    def input_wait_signature(self) -> bytes:
+        return bytes(map(self.pyboy.get_memory_value, self._input_wait_addrs))
+
+    def _screen_rgb(self) -> np.ndarray:
+        """PyBoy 화면 버퍼의 (144, 160, 3) 뷰 (채널 순서는 버전마다 다르지만 흑백 변환에는 상관없음)"""
+        if hasattr(self._screen, 'ndarray'):
+            return self._screen.ndarray[:, :, :3]
+        return self._screen.screen_ndarray()
+
+    def _configure_screen(self, downsample: int, crop: tuple):
+        """
+        관측 화면 크기를 정합니다.
+        crop: (위, 아래, 왼쪽, 오른쪽)에서 잘라낼 픽셀 수 (테두리/텍스트 박스 제거용), None이면 전체 화면
+        downsample: 정수 배율 f. 잘라낸 화면을 f x f 영역 평균(정수 연산)으로 줄입니다. (2면 144x160 -> 72x80)
+        """
+        top, bottom, left, right = crop or (0, 0, 0, 0)
+        height = SCREEN_HEIGHT - top - bottom
+        width = SCREEN_WIDTH - left - right
+        if downsample < 1 or height <= 0 or width <= 0 or height % downsample or width % downsample:
+            raise ValueError(f"화면 {height}x{width}을(를) {downsample}배로 줄일 수 없습니다. (crop={crop})")
+        # 합계는 최대 765 * f * f이므로 f <= 9까지 uint16에 들어갑니다.
+        sum_dtype = np.uint16 if 765 * downsample * downsample <= 0xFFFF else np.uint32
+
+        self.screen_downsample = downsample
+        self.screen_crop = (top, bottom, left, right)
+        self.screen_shape = (1, height // downsample, width // downsample)
+        self._crop_slices = (slice(top, SCREEN_HEIGHT - bottom), slice(left, SCREEN_WIDTH - right))
+        self._luma_sum = np.empty((height, width), dtype=sum_dtype)
+        self._pooled = np.empty(self.screen_shape[1:], dtype=sum_dtype) if downsample > 1 else None
+        self._gray = np.empty(self.screen_shape, dtype=np.uint8)
+
+    def get_screen_gray(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        현재 화면을 흑백 screen_shape (기본 (1, 144, 160)) uint8 CHW 배열로 반환합니다.
+        out을 주지 않으면 매 스텝 재사용되는 내부 버퍼를 돌려주므로, 보관하려면 복사해야 합니다.
+        흑백 값은 기존 np.mean(RGB).astype(uint8)과 같은 (R + G + B) // 3 정수 연산이며,
+        downsample > 1이면 f x f 영역의 RGB 합을 3 * f * f로 나눕니다.
+        """
+        rows, cols = self._crop_slices
+        rgb = self._screen_rgb()[rows, cols]
+        luma = self._luma_sum
+        np.add(rgb[:, :, 0], rgb[:, :, 1], out=luma, dtype=luma.dtype)
+        np.add(luma, rgb[:, :, 2], out=luma)
+        f = self.screen_downsample
+        if f > 1:
+            # f x f 영역 합: 보폭 f의 뷰 f*f개를 더합니다. (reshape().sum()보다 빠름)
+            pooled = self._pooled
+            np.copyto(pooled, luma[0::f, 0::f])
+            for dy in range(f):
+                for dx in range(f):
+                    if dy or dx:
+                        np.add(pooled, luma[dy::f, dx::f], out=pooled)
+            luma = pooled
+        np.floor_divide(luma, 3 * f * f, out=luma)
+        if out is None:
+            out = self._gray
+        np.copyto(out[0], luma, casting='unsafe')
+        return out
 
-        return np.expand_dims(grayscale_screen, axis=-1)
+    def get_tile_observation(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        화면을 렌더링하지 않고 VRAM/OAM에서 바로 읽은 관측을 반환합니다. (둘 다 매 스텝 재사용되는 버퍼)
+        - tiles: (1, 18, 20) 화면에 보이는 배경/윈도우 타일 ID (SCX/SCY 스크롤은 타일 단위로 반영)
+        - sprites: (40, 4) OAM 원본 (y+16, x+8, 타일 ID, 속성), y=0이면 숨겨진 스프라이트
+        """
+        read = self.pyboy.get_memory_value
+        lcdc, scy, scx = read(LCDC_ADDR), read(SCY_ADDR), read(SCX_ADDR)
+        rows, cols = self._tile_rows, self._tile_cols
+
+        bg_base = 0x9C00 if lcdc & 0x08 else 0x9800
+        addrs = bg_base + ((scy // 8 + rows) % 32) * 32 + (scx // 8 + cols) % 32
+        if lcdc & 0x20:  # 윈도우 (텍스트 박스/메뉴)
+            wy, wx = read(WY_ADDR), max(read(WX_ADDR) - 7, 0)
+            if wy < SCREEN_HEIGHT and wx < SCREEN_WIDTH:
+                win_base = 0x9C00 if lcdc & 0x40 else 0x9800
+                win_row, win_col = np.broadcast_arrays(rows - wy // 8, cols - wx // 8)
+                in_window = (win_row >= 0) & (win_col >= 0)
+                addrs = np.where(in_window, win_base + win_row * 32 + win_col, addrs)
+
+        self._tiles[0] = np.fromiter(map(read, addrs.ravel().tolist()), dtype=np.uint8,
+                                     count=TILE_ROWS * TILE_COLS).reshape(TILE_ROWS, TILE_COLS)
+        self._sprites.reshape(-1)[:] = np.fromiter(map(read, range(OAM_START, OAM_START + OAM_SPRITES * 4)),
+                                                  dtype=np.uint8, count=OAM_SPRITES * 4)
+        return self._tiles, self._sprites
+
+    def get_screen_image(self) -> np.ndarray:
+        """
+        현재 게임 화면을 흑백(Grayscale) numpy 배열 (H, W, 1)로 반환합니다. (새 배열)
+        """
+        return self.get_screen_gray().transpose(1, 2, 0).copy()
         
+    def snapshot(self) -> int:
+        """
+        현재 상태를 메모리 링에 저장하고 핸들을 반환합니다. (디스크를 쓰지 않음)
+        화면 버퍼도 함께 저장하므로 restore() 직후 프레임을 진행하지 않아도 관측이 맞습니다.
+        디스크 쓰기만 빠질 뿐 PyBoy의 save_state 직렬화는 그대로라, PyBoy 1.x에서는 한 번에 35~53 ms로
+        step() 한 번보다 오래 걸립니다. 매 스텝이 아니라 분기 지점에서만 부르세요. (benchmark_snapshots로 측정)
+        """
+        handle = self._next_snapshot
+        self._next_snapshot += 1
+        index = handle % self.snapshot_slots
+        slot = self._snapshots[index]
+        if slot is None:
+            slot = {'handle': None, 'buffer': io.BytesIO(), 'screen': np.empty((SCREEN_HEIGHT, SCREEN_WIDTH, 3), dtype=np.uint8)}
+            self._snapshots[index] = slot
+        buffer = slot['buffer']
+        buffer.seek(0)
+        self.pyboy.save_state(buffer)
+        buffer.truncate()
+        np.copyto(slot['screen'], self._screen_rgb())
+        slot['handle'] = handle
+        return handle
+
+    def restore(self, handle: int):
+        """snapshot()으로 저장한 상태로 되돌립니다. 링에서 이미 덮어써진 핸들이면 KeyError"""
+        slot = self._snapshots[handle % self.snapshot_slots] if handle >= 0 else None
+        if slot is None or slot['handle'] != handle:
+            raise KeyError(f"스냅샷 {handle}이(가) 없거나 이미 덮어써졌습니다. (슬롯 수: {self.snapshot_slots})")
+        buffer = slot['buffer']
+        buffer.seek(0)
+        self.pyboy.load_state(buffer)
+        screen = self._screen_rgb()
+        if screen.flags.writeable:
+            np.copyto(screen, slot['screen'])
+
+    def has_snapshot(self, handle: int) -> bool:
+        """핸들이 아직 링에 남아 있는지"""
+        slot = self._snapshots[handle % self.snapshot_slots] if handle >= 0 else None
+        return slot is not None and slot['handle'] == handle
+
     def stop(self):
         """에뮬레이터를 종료합니다."""
         self.pyboy.stop()
@@ -91,4 +479,35 @@ class GameManager:
     def save_state(self, path: str):
         """현재 게임 상태를 지정된 경로에 파일로 저장합니다."""
         with open(path, "wb") as f:
-            self.pyboy.save_state(f)
\ No newline at end of file
+            self.pyboy.save_state(f)
+
+
+def benchmark_snapshots(rom_path: str, state_path: str = None, iterations: int = 200):
+    """snapshot()/restore() 지연 시간 마이크로 벤치마크 (save_state 파일 저장, step() 한 번과 비교)"""
+    manager = GameManager(rom_path, state_path=state_path)
+    manager.reset()
+    for _ in range(manager.snapshot_slots):   # 슬롯 버퍼를 미리 만들어 둠
+        manager.snapshot()
+
+    def measure(fn) -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        return (time.perf_counter() - start) / iterations * 1e3
+
+    results = {'snapshot': measure(manager.snapshot)}
+    handle = manager.snapshot()
+    results['restore'] = measure(lambda: manager.restore(handle))
+    results['save_state (파일)'] = measure(lambda: manager.save_state(os.devnull))
+    results['step (비교용)'] = measure(lambda: manager.step(0))
+    manager.stop()
+    print(f"스냅샷 크기: {len(manager._snapshots[handle % manager.snapshot_slots]['buffer'].getvalue())} bytes, 반복: {iterations}")
+    for name, ms in results.items():
+        print(f"  {name}: {ms:.3f} ms")
+    print(f"  snapshot 한 번 = step {results['snapshot'] / results['step (비교용)']:.1f}회")
+    return results
+
+
+if __name__ == "__main__":
+    # 사용법: python game_manager.py <ROM 경로> [상태 파일 경로]
+    benchmark_snapshots(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
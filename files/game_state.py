@@ -1,7 +1,17 @@
 # game_state.py (공식 플래그 시스템으로 완전 재작성된 버전)
+import os
+import functools
+import weakref
+from collections.abc import MutableMapping
 import numpy as np
 from pyboy import PyBoy
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from ram_schema import (
+    U8, U16_BE, U16_LE, U24_BE, BCD3, NIBBLES, ITEM_SLOT, u8_array,
+    compile_record_dtype, record_byte_ranges, merge_ranges, be_uint, bcd_to_int, split_nibbles,
+)
+from rom_cache import rom_digest, cache_path, atomic_write
 
 # =================================
 # 1. 플레이어 상태 및 위치
@@ -376,6 +386,60 @@ EVENT_FLAGS = {
     'right_box_pile_underground3': 0x0603,    # right box pile in underground3 Goldenrod City there/not there
 }
 
+# 플래그 영역을 한 번에 np.unpackbits로 풀기 위한 인덱스 (import 시 미리 계산)
+# 비트 배열 인덱스 = (주소 - FLAGS_BASE_ADDR) * 8 + 비트 번호 (bitorder='little')
+def flag_bit_index(flag_id: int) -> int:
+    """플래그 ID를 플래그 영역 비트 배열의 인덱스로 변환합니다."""
+    addr, bit = flag_to_address_bit(flag_id)
+    return (addr - FLAGS_BASE_ADDR) * 8 + bit
+
+EVENT_FLAG_NAMES = tuple(EVENT_FLAGS)
+EVENT_FLAG_BIT_INDICES = np.array([flag_bit_index(EVENT_FLAGS[name]) for name in EVENT_FLAG_NAMES], dtype=np.intp)
+FLAG_BYTES = int(EVENT_FLAG_BIT_INDICES.max()) // 8 + 1   # 디코딩할 플래그 영역 크기
+
+# 플래그 기반 요약 섹션: 출력 키 -> EVENT_FLAGS 이름
+FLAG_GROUPS = {
+    'starter': {
+        'starter_received': 'starter_received',
+        'cyndaquil_flag': 'starter_cyndaquil',
+        'totodile_flag': 'starter_totodile',
+        'chikorita_flag': 'starter_chikorita',
+        'has_pokemon_flag': 'got_starter_pokeball',
+    },
+    'rocket_events': {
+        'slowpoke_well_defeated': 'rocket_slowpoke_well_defeated',
+        'radio_tower_attacked': 'rocket_radio_tower_attacked',
+        'radio_tower_cleared': 'rocket_radio_tower_cleared',
+        'mahogany_cleared': 'rocket_mahogany_cleared',
+        'goldenrod_cleared': 'rocket_goldenrod_cleared',
+        'left_goldenrod': 'rocket_left_goldenrod',
+        'mahogany_controls': 'rocket_mahogany_controls',
+    },
+    'elite4_progress': {
+        'will_defeated': 'elite4_will',
+        'koga_defeated': 'elite4_koga',
+        'bruno_defeated': 'elite4_bruno',
+        'karen_defeated': 'elite4_karen',
+        'lance_defeated': 'champion_lance',
+    },
+    'legendary_pokemon': {
+        'red_gyarados_battled': 'battled_red_gyarados',
+        'sudowoodo_battled': 'battled_sudowoodo',
+    },
+    'rival_encounters': {
+        'met_cherrygrove': 'rival_met_cherrygrove',
+        'met_goldenrod_underground': 'rival_met_goldenrod_underground',
+        'met_sprout_tower': 'rival_met_sprout_tower',
+        'met_burned_tower': 'rival_met_burned_tower',
+        'in_dragons_den': 'rival_in_dragons_den',
+        'stolen_pokemon': 'rival_stolen_pokemon',
+    },
+}
+FLAG_GROUP_INDICES = {
+    group: (tuple(keys), np.array([flag_bit_index(EVENT_FLAGS[name]) for name in keys.values()], dtype=np.intp))
+    for group, keys in FLAG_GROUPS.items()
+}
+
 # =================================
 # 6. 인벤토리
 # =================================
@@ -405,6 +469,281 @@ GAME_STATE_ADDRS = {
     'low_hp_warning': 0xC1A6,   # Low HP warning
 }
 
+# 옵션 바이트 (GAME_STATE_ADDRS['options']) 비트 구성
+OPTIONS_TEXT_SPEED_MASK = 0x07      # 비트 0-2: 글자 출력 지연 프레임 (빠름 1, 보통 3, 느림 5)
+OPTIONS_TEXT_SPEED_FAST = 0x01
+OPTIONS_BATTLE_SCENE_OFF = 0x80     # 비트 7: 1이면 전투 애니메이션 끔
+
+def fast_options_value(options: int) -> int:
+    """글자 속도 '빠르게', 전투 애니메이션 '끄기'로 바꾼 옵션 값 (나머지 비트는 유지)"""
+    return (options & ~OPTIONS_TEXT_SPEED_MASK & 0xFF) | OPTIONS_TEXT_SPEED_FAST | OPTIONS_BATTLE_SCENE_OFF
+
+# =================================
+# 8. WRAM 스냅샷
+# =================================
+# 0xC000-0xDFFF 영역을 스텝마다 한 번 버퍼로 복사한 뒤, 모든 _read_* 헬퍼가 버퍼에서 읽습니다.
+WRAM_START = 0xC000
+WRAM_END = 0xE000       # 미포함
+WRAM_SIZE = WRAM_END - WRAM_START
+
+# =================================
+# 9. RAM 스키마 (structured dtype)
+# =================================
+# 각 주소 테이블의 필드 형식. ram_schema.compile_record_dtype로 dtype을 만들고 블록 단위로 디코딩합니다.
+PLAYER_FORMATS = {
+    'map_bank': U8,
+    'map_id': U8,
+    'x_coord': U8,
+    'y_coord': U8,
+    'x_coord_detailed': U8,
+    'y_coord_detailed': U8,
+    'player_id': U16_LE,
+    'player_name': u8_array(10),
+    'rival_name': u8_array(10),
+    'money': BCD3,
+    'johto_badges': U8,
+    'kanto_badges': U8,
+    'time_played': u8_array(5),
+    'sprite': U8,
+    'clothes': U8,
+    'on_bike': U8,
+    'repel_steps': U8,
+}
+PLAYER_BASE = min(PLAYER_ADDRS.values())
+PLAYER_DTYPE = compile_record_dtype(PLAYER_ADDRS, PLAYER_FORMATS, base=PLAYER_BASE)
+
+POKEMON_FORMATS = {
+    'species_id': U8,
+    'item_held': U8,
+    'moves': u8_array(4),
+    'id_number': U16_BE,
+    'experience': U24_BE,
+    'hp_ev': U16_BE,
+    'attack_ev': U16_BE,
+    'defense_ev': U16_BE,
+    'speed_ev': U16_BE,
+    'special_ev': U16_BE,
+    'attack_defense_iv': NIBBLES,
+    'speed_special_iv': NIBBLES,
+    'pp_moves': u8_array(4),
+    'happiness': U8,
+    'pokerus': U8,
+    'caught_data': U16_BE,
+    'level': U8,
+    'status': U16_BE,
+    'hp': U16_BE,
+    'max_hp': U16_BE,
+    'attack': U16_BE,
+    'defense': U16_BE,
+    'speed': U16_BE,
+    'sp_defense': U16_BE,
+    'sp_attack': U16_BE,
+}
+POKEMON_DTYPE = compile_record_dtype(POKEMON_OFFSETS, POKEMON_FORMATS, itemsize=POKEMON_DATA_SIZE)
+
+# 파티 블록: count + 종족 리스트 + 6마리 48바이트 레코드를 한 번에
+PARTY_FORMATS = {
+    'count': U8,
+    'pokemon_list': u8_array(6),
+    'end_marker': U8,
+    'data_start': (POKEMON_DTYPE, (6,)),
+}
+PARTY_BASE = PARTY_ADDRS['count']
+PARTY_DTYPE = compile_record_dtype(PARTY_ADDRS, PARTY_FORMATS, base=PARTY_BASE)
+
+BATTLE_FORMATS = {
+    'battle_type': U8,
+    'enemy_species': U8,
+    'enemy_level': U8,
+    'enemy_status': U8,
+    'enemy_hp': U16_BE,
+    'enemy_max_hp': U16_BE,
+    'enemy_attack': U16_BE,
+    'enemy_defense': U16_BE,
+    'enemy_speed': U16_BE,
+    'enemy_sp_attack': U16_BE,
+    'enemy_sp_defense': U16_BE,
+    'enemy_item': U8,
+    'enemy_moves': u8_array(4),
+    'enemy_dvs_1': NIBBLES,
+    'enemy_dvs_2': NIBBLES,
+    'enemy_gender': U8,
+    'enemy_types': u8_array(2),
+    'enemy_damage': U16_BE,
+}
+BATTLE_BASE = min(BATTLE_ADDRS.values())
+BATTLE_DTYPE = compile_record_dtype(BATTLE_ADDRS, BATTLE_FORMATS, base=BATTLE_BASE)
+
+# experience_given(0xCF7E)은 블록에서 멀리 떨어져 있어 제외합니다.
+YOUR_BATTLE_FORMATS = {
+    'item_held': U8,
+    'moves': u8_array(4),
+    'pp_moves': u8_array(4),
+    'status': U8,
+    'hp': U16_BE,
+    'types': u8_array(2),
+    'substitute': U8,
+    'money_earned': U16_BE,
+    'current_attack': U8,
+}
+YOUR_BATTLE_BASE = YOUR_BATTLE_ADDRS['item_held']
+YOUR_BATTLE_DTYPE = compile_record_dtype(YOUR_BATTLE_ADDRS, YOUR_BATTLE_FORMATS, base=YOUR_BATTLE_BASE)
+
+# 가방: TM/HM + 아이템/중요한 물건/볼 포켓 (0xD57E-0xD614 연속 블록)
+BAG_ADDRS = {**TM_HM_ADDRS, **INVENTORY_ADDRS}
+BAG_FORMATS = {
+    'tms_start': u8_array(50),
+    'hms_start': u8_array(7),
+    'item_count': U8,
+    'items_start': (ITEM_SLOT, (20,)),
+    'key_item_count': U8,
+    'key_items_start': u8_array(26),
+    'ball_count': U8,
+    'balls_start': (ITEM_SLOT, (12,)),
+}
+BAG_BASE = TM_HM_ADDRS['tms_start']
+BAG_DTYPE = compile_record_dtype(BAG_ADDRS, BAG_FORMATS, base=BAG_BASE)
+
+POKEDEX_FORMATS = {
+    'owned_start': u8_array(POKEDEX_ADDRS['owned_end'] - POKEDEX_ADDRS['owned_start'] + 1),
+    'seen_start': u8_array(POKEDEX_ADDRS['seen_end'] - POKEDEX_ADDRS['seen_start'] + 1),
+}
+POKEDEX_BASE = POKEDEX_ADDRS['owned_start']
+POKEDEX_DTYPE = compile_record_dtype(POKEDEX_ADDRS, POKEDEX_FORMATS, base=POKEDEX_BASE)
+
+# get_party_array()가 돌려주는 평탄화 배열의 열 이름 (6 x len(PARTY_ARRAY_COLUMNS))
+PARTY_ARRAY_COLUMNS = (
+    'species_id', 'level', 'current_hp', 'max_hp',
+    'attack', 'defense', 'speed', 'sp_attack', 'sp_defense', 'experience',
+    'iv_attack', 'iv_defense', 'iv_speed', 'iv_special',
+    'move_1', 'move_2', 'move_3', 'move_4', 'pp_1', 'pp_2', 'pp_3', 'pp_4',
+    'happiness', 'pokerus', 'status', 'item_held',
+)
+
+# 파티 디코더(_get_party_info, get_party_array)가 실제로 읽는 POKEMON_DTYPE 필드
+PARTY_MEMBER_FIELDS = (
+    'species_id', 'item_held', 'moves', 'experience', 'attack_defense_iv', 'speed_special_iv',
+    'pp_moves', 'happiness', 'pokerus', 'level', 'status', 'hp', 'max_hp',
+    'attack', 'defense', 'speed', 'sp_attack', 'sp_defense',
+)
+
+# 스냅샷 섹션: 섹션 이름 -> 디코더가 실제로 사용하는 구간 [start, end)
+# 스키마에 선언된 필드 구간에서 자동으로 계산되며, 갱신 티어(RefreshPolicy)의 단위가 됩니다.
+LOCATION_FIELDS = ('map_bank', 'map_id', 'x_coord', 'y_coord', 'x_coord_detailed', 'y_coord_detailed')
+NAME_FIELDS = ('player_id', 'player_name', 'rival_name')
+SNAPSHOT_SECTIONS = {
+    'location': record_byte_ranges(PLAYER_DTYPE, PLAYER_BASE, fields=LOCATION_FIELDS),
+    'player': record_byte_ranges(
+        PLAYER_DTYPE, PLAYER_BASE,
+        fields=[name for name in PLAYER_DTYPE.names if name not in LOCATION_FIELDS + NAME_FIELDS],
+    ),
+    'names': record_byte_ranges(PLAYER_DTYPE, PLAYER_BASE, fields=NAME_FIELDS),
+    'party': record_byte_ranges(PARTY_DTYPE, PARTY_BASE),
+    'battle': record_byte_ranges(BATTLE_DTYPE, BATTLE_BASE),
+    'game_mode': [(GAME_STATE_ADDRS['game_mode'], GAME_STATE_ADDRS['game_mode'] + 1)],
+    'bag': record_byte_ranges(BAG_DTYPE, BAG_BASE),
+    'event_flags': [(FLAGS_BASE_ADDR, FLAGS_BASE_ADDR + FLAG_BYTES)],
+    'pokedex': record_byte_ranges(POKEDEX_DTYPE, POKEDEX_BASE),
+}
+
+# PyBoy 1.x처럼 범위 읽기 API가 없는 경우를 위해 디코더가 사용하는 구간만 복사합니다.
+SNAPSHOT_REGIONS = merge_ranges([r for ranges in SNAPSHOT_SECTIONS.values() for r in ranges])
+
+# 보상 코드가 구독하는 RAM 구간 (GameState.watch 이름 -> [start, end) 목록)
+WATCH_RANGES = {
+    'location': [(PLAYER_ADDRS['map_bank'], PLAYER_ADDRS['y_coord'] + 1)],
+    'badges': [(PLAYER_ADDRS['johto_badges'], PLAYER_ADDRS['kanto_badges'] + 1)],
+    'party_hp': [(PARTY_ADDRS['count'], PARTY_ADDRS['count'] + 1)] + [
+        (hp, hp + 2) for hp in (
+            PARTY_ADDRS['data_start'] + i * POKEMON_DATA_SIZE + POKEMON_OFFSETS['hp'] for i in range(6)
+        )
+    ],
+    'party': SNAPSHOT_SECTIONS['party'],
+    'battle': [
+        (BATTLE_ADDRS['battle_type'], BATTLE_ADDRS['battle_type'] + 1),
+        (BATTLE_ADDRS['enemy_hp'], BATTLE_ADDRS['enemy_hp'] + 2),
+    ],
+    'menu': SNAPSHOT_SECTIONS['game_mode'],
+    'bag': SNAPSHOT_SECTIONS['bag'],
+    'event_flags': SNAPSHOT_SECTIONS['event_flags'],
+}
+
+
+def sections_covering(ranges: list[tuple[int, int]]) -> tuple:
+    """구간들과 겹치는 스냅샷 섹션 이름들. 스냅샷에 없는 바이트가 있으면 ValueError"""
+    sections = []
+    for start, end in ranges:
+        covered = 0
+        for section, section_ranges in SNAPSHOT_SECTIONS.items():
+            for s_start, s_end in section_ranges:
+                overlap = min(end, s_end) - max(start, s_start)
+                if overlap > 0:
+                    covered += overlap
+                    if section not in sections:
+                        sections.append(section)
+        if covered < end - start:
+            raise ValueError(f"0x{start:04X}-0x{end:04X} 구간이 스냅샷 섹션에 포함되지 않습니다.")
+    return tuple(sections)
+
+
+@dataclass
+class RamWatch:
+    """GameState.watch()로 등록된 RAM 구간 구독"""
+    name: str
+    ranges: list
+    callback: object = None     # callback(name, old: bytes, new: bytes)
+    sections: tuple = ()
+    value: bytes = None         # 마지막으로 본 바이트
+
+
+# --- 갱신 티어 ---
+# hot: 매 스텝 / warm: warm_interval 스텝마다 또는 트리거 바이트가 바뀔 때 / cold: 에피소드 경계나 명시적 요청 때만
+REFRESH_TIERS = ('hot', 'warm', 'cold')
+TIERED_SECTION_TIERS = {
+    'location': 'hot',
+    'party': 'hot',
+    'battle': 'hot',
+    'game_mode': 'hot',
+    'player': 'warm',       # 돈, 배지, 자전거, 스프레이
+    'bag': 'warm',
+    'event_flags': 'warm',
+    'names': 'cold',
+    'pokedex': 'cold',
+}
+
+
+@dataclass
+class RefreshPolicy:
+    """
+    GameState.refresh()가 섹션별로 얼마나 자주 스냅샷을 갱신할지 정합니다.
+    tiers에 없는 섹션은 hot으로 취급합니다. 기본값(tiers 비어 있음)은 모든 섹션을 매 스텝 갱신합니다.
+    """
+    tiers: dict = field(default_factory=dict)
+    warm_interval: int = 16
+    warm_triggers: tuple = (BATTLE_ADDRS['battle_type'], PLAYER_ADDRS['map_id'])
+
+    @classmethod
+    def tiered(cls, warm_interval: int = 16) -> 'RefreshPolicy':
+        """TIERED_SECTION_TIERS를 쓰는 정책 (배지/가방/플래그는 warm, 이름/도감은 cold)"""
+        return cls(tiers=dict(TIERED_SECTION_TIERS), warm_interval=warm_interval)
+
+    def tier_regions(self) -> dict:
+        """티어 -> 병합된 구간 목록"""
+        regions = {tier: [] for tier in REFRESH_TIERS}
+        for section, ranges in SNAPSHOT_SECTIONS.items():
+            tier = self.tiers.get(section, 'hot')
+            if tier not in regions:
+                raise ValueError(f"알 수 없는 갱신 티어 '{tier}' (섹션: {section})")
+            regions[tier].extend(ranges)
+        return {tier: merge_ranges(ranges) for tier, ranges in regions.items()}
+
+    def tier_sections(self) -> dict:
+        """티어 -> 섹션 이름 목록"""
+        sections = {tier: [] for tier in REFRESH_TIERS}
+        for section in SNAPSHOT_SECTIONS:
+            sections[self.tiers.get(section, 'hot')].append(section)
+        return sections
+
 
 # =================================
 # ✨ 1. 새로운 데이터 클래스 정의 (맵 연결 정보 저장용)
@@ -429,7 +768,13 @@ class RomMapper:
     # DataCrystal 문서에서 확인된 핵심 상수 주소들
     MAP_BANKS_POINTER_TABLE = 0x28000  # ROM Bank 0x0A, Address 0x4000
 
-    def __init__(self, rom_path: str):
+    # 금/은의 맵 그룹 수. 그룹은 1번부터이고 맵 ID도 1번부터입니다. 이 범위 밖의 (bank, map)은 헤더가 아니므로 파싱하지 않습니다.
+    MAP_GROUP_COUNT = 26
+
+    CONNECTION_DIRECTIONS = ("NORTH", "SOUTH", "WEST", "EAST")
+    CONNECTION_CACHE_NAME = "map_connections_v2.npz"   # 포맷이 바뀌면 버전을 올립니다.
+
+    def __init__(self, rom_path: str, use_cache: bool = True):
         """ROM 파일을 로드하고 초기화합니다."""
         print("ROM Mapper를 초기화하고 ROM 데이터를 로드합니다...")
         try:
@@ -440,6 +785,12 @@ class RomMapper:
             print(f"오류: ROM 파일 '{rom_path}'를 찾을 수 없습니다.")
             self.rom_data = None
 
+        # 전체 (bank, map)의 연결 정보를 한 번만 파싱한 CSR 테이블
+        # 키 = bank * 256 + map, 해당 맵의 연결은 각 배열의 [indptr[key], indptr[key + 1]) 구간
+        self._connection_table = self._load_connection_table(rom_path, use_cache)
+        self._connection_dicts = {}     # (bank, map) -> tuple[dict] (한 번 만들고 재사용)
+        self._global_offsets = None     # get_global_map_offsets() 결과 (처음 요청할 때 계산)
+
     # --- ROM 데이터 읽기 헬퍼 함수 ---
     def _read_byte(self, address: int) -> int:
         return self.rom_data[address]
@@ -467,10 +818,84 @@ class RomMapper:
         # 최종 ROM 주소로 변환
         return (bank_id - 1) * 0x4000 + (map_header_local_addr - 0x4000)
 
-    # --- 메인 로직: 맵 연결 정보 추출 ---
+    # --- 연결 테이블 (시작 시 한 번 파싱 + ROM 해시 키 디스크 캐시) ---
+    def _load_connection_table(self, rom_path: str, use_cache: bool) -> dict:
+        if self.rom_data is None:
+            return self._build_connection_table()
+
+        path = cache_path(rom_path, rom_digest(self.rom_data), self.CONNECTION_CACHE_NAME)
+        if use_cache and os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    return {name: data[name] for name in data.files}
+            except Exception as e:
+                print(f"맵 연결 캐시를 읽지 못해 다시 파싱합니다: {e}")
+
+        print("맵 연결 테이블을 생성합니다 (최초 1회)...")
+        table = self._build_connection_table()
+        if use_cache:
+            try:
+                atomic_write(path, lambda f: np.savez(f, **table))
+            except OSError as e:
+                print(f"맵 연결 캐시 저장 실패: {e}")
+        return table
+
+    def _build_connection_table(self) -> dict:
+        """유효한 (bank, map) 조합을 모두 파싱하여 CSR 형태의 배열로 만듭니다. (나머지 키는 연결 없음)"""
+        indptr = np.zeros(256 * 256 + 1, dtype=np.int32)
+        rows = []
+        if self.rom_data is not None:
+            for key in range(256 * 256):
+                if self._is_valid_map(key >> 8, key & 0xFF):
+                    for conn in self._parse_map_connections(key >> 8, key & 0xFF):
+                        rows.append((self.CONNECTION_DIRECTIONS.index(conn.direction),
+                                     conn.dest_bank, conn.dest_map, conn.target_x, conn.target_y))
+                indptr[key + 1] = len(rows)
+        conns = np.array(rows, dtype=np.int32).reshape(-1, 5)
+        return {
+            'indptr': indptr,
+            'direction': conns[:, 0].astype(np.uint8),
+            'dest_bank': conns[:, 1].astype(np.uint8),
+            'dest_map': conns[:, 2].astype(np.uint8),
+            'target_x': conns[:, 3].astype(np.int16),
+            'target_y': conns[:, 4].astype(np.int16),
+        }
+
+    def _is_valid_map(self, bank_id: int, map_id: int) -> bool:
+        return 1 <= bank_id <= self.MAP_GROUP_COUNT and map_id >= 1
+
     def get_map_connections(self, bank_id: int, map_id: int) -> list[MapConnection]:
+        """주어진 맵의 모든 출구(연결) 정보를 미리 만든 연결 테이블에서 반환합니다."""
+        table = self._connection_table
+        key = (bank_id & 0xFF) * 256 + (map_id & 0xFF)
+        start, end = int(table['indptr'][key]), int(table['indptr'][key + 1])
+        return [
+            MapConnection(self.CONNECTION_DIRECTIONS[d], dest_bank, dest_map, target_x, target_y)
+            for d, dest_bank, dest_map, target_x, target_y in zip(
+                table['direction'][start:end].tolist(),
+                table['dest_bank'][start:end].tolist(),
+                table['dest_map'][start:end].tolist(),
+                table['target_x'][start:end].tolist(),
+                table['target_y'][start:end].tolist(),
+            )
+        ]
+
+    def get_map_connection_dicts(self, bank_id: int, map_id: int) -> tuple[dict, ...]:
         """
-        주어진 맵의 모든 출구(연결) 정보를 파싱하여 반환합니다.
+        get_state_dict용 O(1) 조회. 맵마다 처음 한 번만 dict를 만들고 이후에는 같은 객체를 돌려줍니다.
+        (반환값은 공유되므로 수정하지 마세요.)
+        """
+        key = (bank_id, map_id)
+        cached = self._connection_dicts.get(key)
+        if cached is None:
+            cached = tuple(c.__dict__ for c in self.get_map_connections(bank_id, map_id))
+            self._connection_dicts[key] = cached
+        return cached
+
+    # --- 메인 로직: 맵 연결 정보 추출 ---
+    def _parse_map_connections(self, bank_id: int, map_id: int) -> list[MapConnection]:
+        """
+        주어진 맵의 모든 출구(연결) 정보를 ROM에서 파싱하여 반환합니다.
         DataCrystal의 ROM map 및 Notes 문서를 기반으로 정교하게 구현되었습니다.
         """
         if self.rom_data is None:
@@ -490,7 +915,7 @@ class RomMapper:
             connection_flags = self._read_byte(sec_header_addr + 12)
             
             connections = []
-            connection_directions = ["NORTH", "SOUTH", "WEST", "EAST"]
+            connection_directions = self.CONNECTION_DIRECTIONS
             
             # 연결 데이터는 2차 헤더 바로 다음에 위치합니다. (크기 13바이트)
             current_connection_addr = sec_header_addr + 13
@@ -539,21 +964,613 @@ class RomMapper:
             # print(f"맵 연결 정보 파싱 중 오류 발생 (Bank: {bank_id}, Map: {map_id}): {e}")
             return []
 
+    # --- 전역 좌표 (연결 정보로 맵들을 한 캔버스에 배치) ---
+    DEFAULT_MAP_SPAN = 32   # 역방향 연결이 없을 때 이웃 맵을 떨어뜨려 놓는 거리, 컴포넌트 사이 여백
+    # 전역 배치를 시작하는 실외 맵 (bank, map_id). 이 맵들과 연결로 이어진 맵만 배치합니다.
+    GLOBAL_MAP_SEEDS = (
+        (24, 4),    # 연두마을 (조토)
+        (10, 1),    # 석영고원 (관동 쪽)
+    )
+
+    def get_global_map_offsets(self) -> dict[tuple[int, int], tuple[int, int]]:
+        """
+        (bank, map) -> 전역 캔버스에서 맵 (0, 0) 좌표의 위치 (x, y).
+        GLOBAL_MAP_SEEDS에서 시작해 연결(NORTH/SOUTH/WEST/EAST)로 이어진 맵들을 BFS로 배치합니다. 출구 좌표와 상대 맵의
+        역방향 출구 좌표가 한 칸 차이로 맞닿도록 놓으므로 대략적인 배치입니다. 서로 연결되지 않은 묶음(조토/관동)은
+        가로로 나란히 놓고, 시작 맵에서 닿지 않는 맵(건물 안, 동굴, 헤더가 아닌 바이트)은 포함하지 않습니다.
+        """
+        if self._global_offsets is None:
+            self._global_offsets = self._build_global_offsets()
+        return self._global_offsets
+
+    def _build_global_offsets(self) -> dict:
+        table = self._connection_table
+        indptr = table['indptr']
+        offsets = {}
+        next_x = 0
+        for bank_id, map_id in self.GLOBAL_MAP_SEEDS:
+            root = bank_id * 256 + map_id
+            if root in offsets or indptr[root + 1] == indptr[root]:
+                continue
+            component = {root: (0, 0)}
+            queue = [root]
+            while queue:
+                key = queue.pop(0)
+                ox, oy = component[key]
+                for row in range(int(indptr[key]), int(indptr[key + 1])):
+                    dest_bank, dest_map = int(table['dest_bank'][row]), int(table['dest_map'][row])
+                    dest = dest_bank * 256 + dest_map
+                    if dest in component or dest in offsets or not self._is_valid_map(dest_bank, dest_map):
+                        continue
+                    dx, dy = self._connection_shift(key, row, dest)
+                    component[dest] = (ox + dx, oy + dy)
+                    queue.append(dest)
+            min_x = min(x for x, _ in component.values())
+            min_y = min(y for _, y in component.values())
+            for key, (x, y) in component.items():
+                offsets[key] = (x - min_x + next_x, y - min_y)
+            next_x += max(x for x, _ in component.values()) - min_x + 2 * self.DEFAULT_MAP_SPAN
+        return {(key >> 8, key & 0xFF): offset for key, offset in offsets.items()}
+
+    def _connection_shift(self, key: int, row: int, dest: int) -> tuple[int, int]:
+        """key 맵 원점에서 dest 맵 원점까지의 이동량. 출구 좌표와 dest의 역방향 출구 좌표를 맞댑니다."""
+        table = self._connection_table
+        direction = int(table['direction'][row])
+        step_x, step_y = ((0, -1), (0, 1), (-1, 0), (1, 0))[direction]   # NORTH, SOUTH, WEST, EAST
+        exit_x, exit_y = int(table['target_x'][row]), int(table['target_y'][row])
+        opposite = direction ^ 1
+        for back in range(int(table['indptr'][dest]), int(table['indptr'][dest + 1])):
+            back_dest = int(table['dest_bank'][back]) * 256 + int(table['dest_map'][back])
+            if back_dest == key and int(table['direction'][back]) == opposite:
+                entry_x, entry_y = int(table['target_x'][back]), int(table['target_y'][back])
+                return exit_x - entry_x + step_x, exit_y - entry_y + step_y
+        span = self.DEFAULT_MAP_SPAN
+        return (exit_x + step_x * span if step_x else 0), (exit_y + step_y * span if step_y else 0)
+
+
+# =================================
+# 상태 dict (지연 평가)
+# =================================
+# get_state_dict()의 키 -> 해당 섹션을 디코딩하는 GameState 메서드 이름 (키 순서 = dict 순서)
+STATE_SECTIONS = {
+    'is_in_menu': 'is_in_menu',
+    'location': '_get_location_info',
+    'player_info': '_get_player_info',
+    'party_info': '_get_party_section',
+    'map_connections': '_get_current_map_connections',
+    'event_statuses': '_get_event_flags_info',
+    'starter_info': 'get_starter_info',
+    'rocket_events': 'get_rocket_events_info',
+    'elite4_progress': 'get_elite4_info',
+    'legendary_pokemon': 'get_legendary_pokemon_info',
+    'rival_encounters': 'get_rival_encounters_info',
+    'pokedex': 'get_pokedex_info',
+    'inventory': '_get_inventory_info',
+}
+
+
+class LazyStateDict(MutableMapping):
+    """
+    get_state_dict()가 돌려주는 dict 호환 상태.
+    각 섹션은 처음 접근할 때 디코딩되어 그 프레임 동안 캐시됩니다.
+    (state['party_info'], state.get(...), items(), 'key' in state 모두 dict와 같게 동작)
+    피클/복사하면 모든 섹션이 디코딩된 일반 dict가 됩니다. (SubprocVecEnv, get_attr 전달용)
+    """
+    __slots__ = ('_reader', '_values', '_pending', '_keys', '__weakref__')
+
+    def __init__(self, reader: 'GameState', values: dict, pending: dict, keys: list):
+        self._reader = reader
+        self._values = values        # 이미 디코딩된 섹션
+        self._pending = pending      # 아직 디코딩하지 않은 섹션: key -> 메서드 이름
+        self._keys = keys            # dict 순서
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        method = self._pending.pop(key)  # 없는 키면 dict처럼 KeyError
+        value = self._values[key] = getattr(self._reader, method)()
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self._values and key not in self._pending:
+            self._keys.append(key)
+        self._pending.pop(key, None)
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        if key not in self._values and key not in self._pending:
+            raise KeyError(key)
+        self._values.pop(key, None)
+        self._pending.pop(key, None)
+        self._keys.remove(key)
+
+    def __contains__(self, key):
+        return key in self._values or key in self._pending
+
+    def __iter__(self):
+        return iter(list(self._keys))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def __reduce__(self):
+        return (dict, (self.to_dict(),))
+
+    def copy(self) -> dict:
+        return self.to_dict()
+
+    def to_dict(self) -> dict:
+        """모든 섹션을 디코딩한 일반 dict"""
+        return {key: self[key] for key in self._keys}
+
+    @property
+    def pending_sections(self) -> tuple:
+        """아직 디코딩되지 않은 섹션 이름들"""
+        return tuple(self._pending)
+
+    def _decode_pending(self, methods: set):
+        """
+        스냅샷이 다음 프레임으로 덮어써지기 전에 호출됩니다.
+        바이트가 바뀔 섹션을 읽는 남은 섹션(methods)만 지금 디코딩하므로, prev_state처럼 한 스텝 뒤에 읽어도 그 프레임의 값이 나옵니다.
+        (나머지 섹션은 바이트가 그대로이므로 나중에 디코딩해도 같은 값)
+        """
+        for key, method in list(self._pending.items()):
+            if method in methods:
+                self[key]
+
+
+# =================================
+# 관측 상태 벡터
+# =================================
+# PokemonGoldEnv "state" 관측: 값 = RAM 바이트 * 배율 + 오프셋 (float32)
+#   x, y, map_bank, map_id : 최대 255로 보고 -1 ~ 1로 정규화
+#   johto 배지 수          : 배지 바이트의 설정된 비트 수 / 8 (0 ~ 1)
+STATE_VECTOR_ADDRS = [
+    PLAYER_ADDRS['x_coord'],
+    PLAYER_ADDRS['y_coord'],
+    PLAYER_ADDRS['map_bank'],
+    PLAYER_ADDRS['map_id'],
+    PLAYER_ADDRS['johto_badges'],
+]
+STATE_VECTOR_SCALE = np.array([1 / 128, 1 / 128, 1 / 128, 1 / 128, 1 / 8], dtype=np.float32)
+STATE_VECTOR_OFFSET = np.array([-1, -1, -1, -1, 0], dtype=np.float32)
+STATE_VECTOR_POPCOUNT = 4   # 비트 수로 바꿔 쓰는 항목 (배지)
+STATE_VECTOR_SIZE = len(STATE_VECTOR_ADDRS)
+_POPCOUNT = bytes(bin(i).count('1') for i in range(256))
+
+# =================================
+# 압축 상태 레코드 (IPC용)
+# =================================
+# SubprocVecEnv 파이프로 매 스텝 보내는 고정 길이 레코드. 중첩 dict 대신 bytes로 직렬화합니다.
+# 레이아웃 (리틀엔디안, 패딩 없음, 총 COMPACT_STATE_DTYPE.itemsize 바이트):
+#   map_bank, map_id, x_coord, y_coord       u1 x4   현재 위치
+#   is_in_battle, is_in_menu                 u1 x2   0/1
+#   johto_badges_count, kanto_badges_count   u1 x2
+#   money                                    u4
+#   party_count                              u1
+#   party_level_sum                          u2
+#   party_hp_sum                             u4
+#   enemy_species, enemy_level               u1 x2   전투 중이 아니면 0
+#   enemy_hp                                 u2
+#   events_completed                         u2      EVENT_FLAGS 중 설정된 개수
+#   event_bits                               u1 x N  EVENT_FLAG_NAMES 순서의 비트 (packbits, little)
+COMPACT_EVENT_BYTES = (len(EVENT_FLAG_NAMES) + 7) // 8
+COMPACT_STATE_DTYPE = np.dtype([
+    ('map_bank', 'u1'), ('map_id', 'u1'), ('x_coord', 'u1'), ('y_coord', 'u1'),
+    ('is_in_battle', 'u1'), ('is_in_menu', 'u1'),
+    ('johto_badges_count', 'u1'), ('kanto_badges_count', 'u1'),
+    ('money', '<u4'),
+    ('party_count', 'u1'),
+    ('party_level_sum', '<u2'), ('party_hp_sum', '<u4'),
+    ('enemy_species', 'u1'), ('enemy_level', 'u1'), ('enemy_hp', '<u2'),
+    ('events_completed', '<u2'),
+    ('event_bits', 'u1', (COMPACT_EVENT_BYTES,)),
+])
+
+
+class CompactState:
+    """
+    GameState.get_compact_state()가 만든 bytes를 읽는 메인 프로세스 쪽 접근자.
+    state.map_id처럼 필드를 속성으로 읽고, 필요할 때만 event_statuses()/to_state_dict()로 풀어 씁니다.
+    """
+    __slots__ = ('record',)
+
+    def __init__(self, blob: bytes):
+        self.record = np.frombuffer(blob, dtype=COMPACT_STATE_DTYPE, count=1)[0]
+
+    def __getattr__(self, name):
+        # copy/pickle은 __init__ 없이 객체를 만든 뒤 __reduce_ex__, __setstate__ 등을 찾으므로
+        # record 슬롯이 비어 있을 수 있습니다. 여기서 self.record를 읽으면 __getattr__이 무한히 재귀합니다.
+        if name == 'record' or name.startswith('__'):
+            raise AttributeError(name)
+        try:
+            return self.record[name].item()
+        except (KeyError, ValueError):
+            raise AttributeError(name) from None
+
+    def __reduce__(self):
+        # 워커 -> 메인 프로세스 IPC로 오가는 타입이므로 원래 bytes로 다시 만듭니다.
+        return CompactState, (self.record.tobytes(),)
+
+    def event_statuses(self) -> dict:
+        bits = np.unpackbits(self.record['event_bits'], bitorder='little')[:len(EVENT_FLAG_NAMES)]
+        return dict(zip(EVENT_FLAG_NAMES, bits.astype(bool).tolist()))
+
+    def to_state_dict(self) -> dict:
+        """get_state_dict()와 같은 키 구조의 요약 dict (레코드에 있는 필드만)"""
+        r = self.record
+        state = {
+            'is_in_battle': bool(r['is_in_battle']),
+            'is_in_menu': bool(r['is_in_menu']),
+            'location': {
+                'map_bank': int(r['map_bank']),
+                'map_id': int(r['map_id']),
+                'x_coord': int(r['x_coord']),
+                'y_coord': int(r['y_coord']),
+            },
+            'player_info': {
+                'money': int(r['money']),
+                'johto_badges_count': int(r['johto_badges_count']),
+                'kanto_badges_count': int(r['kanto_badges_count']),
+            },
+            'party_info': {
+                'count': int(r['party_count']),
+                'party_level_sum': int(r['party_level_sum']),
+                'party_hp_sum': int(r['party_hp_sum']),
+            },
+            'event_statuses': self.event_statuses(),
+        }
+        if state['is_in_battle']:
+            state['battle_info'] = {
+                'enemy_species': int(r['enemy_species']),
+                'enemy_level': int(r['enemy_level']),
+                'enemy_hp': int(r['enemy_hp']),
+            }
+        return state
+
+
+# =================================
+# 디코딩 캐시 (변경된 섹션만 다시 디코딩)
+# =================================
+def decoded_from(*sections: str):
+    """
+    GameState 디코더 메서드용 데코레이터.
+    의존하는 스냅샷 섹션(SNAPSHOT_SECTIONS)의 바이트가 바뀌지 않았으면 이전 스텝의 디코딩 결과를 그대로 돌려줍니다.
+    (반환된 객체는 여러 스텝이 공유하므로 수정하면 안 됩니다)
+    지연 스냅샷(PyBoy 1.x)에서는 지난 디코딩이 읽은 구간만 다시 읽어 섹션 버전을 갱신한 뒤 비교합니다.
+    """
+    def decorator(method):
+        name = method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self):
+            if not self._snapshot_valid:
+                return method(self)
+            versions = self._section_versions
+            cached = self._decode_cache.get(name)
+            if cached is not None:
+                for start, end in cached[2]:
+                    self._fetch(start, end)
+                if cached[0] == tuple(versions[section] for section in sections):
+                    return cached[1]
+            outer, self._read_log = self._read_log, []
+            try:
+                value = method(self)
+                read = merge_ranges(self._read_log)
+            finally:
+                log, self._read_log = self._read_log, outer
+            if outer is not None:
+                outer.extend(log)
+            self._decode_cache[name] = (tuple(versions[section] for section in sections), value, read)
+            return value
+        wrapper.sections = sections
+        return wrapper
+    return decorator
+
 
 # =================================
 # GameState 클래스
 # =================================
 class GameState:
-    def __init__(self, pyboy: PyBoy, rom_path: str = "PokemonGold.gbc"): 
+    def __init__(self, pyboy: PyBoy, rom_path: str = "PokemonGold.gbc", use_snapshot: bool = True,
+                 refresh_policy: RefreshPolicy = None):
         self.pyboy = pyboy
         # ✨ RomMapper 인스턴스를 생성합니다.
         self.rom_mapper = RomMapper(rom_path)
 
+        # WRAM 스냅샷 버퍼 (재사용). memoryview 인덱싱은 파이썬 int를 바로 돌려줍니다.
+        self.use_snapshot = use_snapshot
+        self._wram = np.zeros(WRAM_SIZE, dtype=np.uint8)
+        self._wram_view = memoryview(self._wram)
+        self._covered = np.zeros(WRAM_SIZE, dtype=np.bool_)
+        self._covered_view = memoryview(self._covered)
+        self._snapshot_valid = False
+        self._flag_bits = None      # 플래그 영역 비트 배열 (스텝마다 한 번 디코딩)
+        self._record_coverage = {}  # (address, dtype, count, fields) -> (스냅샷이 모든 필드를 담고 있는지, 필드 구간)
+        self._issued_states = []    # 남은 섹션이 있는 발급된 LazyStateDict들 (weakref)
+
+        # PyBoy 2.x는 pyboy.memory[start:end] 슬라이스로 한 번에 읽을 수 있으므로 refresh 때 SNAPSHOT_REGIONS를 복사합니다.
+        # PyBoy 1.x는 바이트마다 get_memory_value를 불러야 해서 통째로 복사하면 기존 주소별 읽기보다 느립니다.
+        # 그래서 1.x에서는 refresh가 구간을 '다시 읽어야 함'으로 표시만 하고, 디코더가 실제로 읽는 바이트만
+        # 그 스텝에 처음 읽을 때 복사합니다. (지연 스냅샷: 아무도 읽지 않는 바이트는 비용이 없음)
+        self._bulk_memory = getattr(pyboy, 'memory', None)
+        self._lazy_fetch = use_snapshot and self._bulk_memory is None
+        self._fresh = bytearray(WRAM_SIZE)     # 지연 스냅샷: 마지막 refresh 이후 읽어 온 바이트는 1
+        self._read_log = None       # 지연 스냅샷: 디코딩 중인 메서드가 읽은 구간 (decoded_from 캐시 검증용)
+        self._offset_sections = [None] * WRAM_SIZE     # 스냅샷 오프셋 -> 섹션 이름 (지연 스냅샷 변경 추적용)
+        for section, ranges in SNAPSHOT_SECTIONS.items():
+            for start, end in ranges:
+                self._offset_sections[start - WRAM_START:end - WRAM_START] = [section] * (end - start)
+        for start, end in SNAPSHOT_REGIONS:
+            self._covered[start - WRAM_START:end - WRAM_START] = True
+
+        # 관측 상태 벡터 (fill_state_vector): 스냅샷 오프셋과 재사용 버퍼
+        self._state_vector_offsets = np.array(STATE_VECTOR_ADDRS, dtype=np.intp) - WRAM_START
+        self._state_vector_in_snapshot = bool(self._covered[self._state_vector_offsets].all())
+        self._state_vector_raw = np.zeros(STATE_VECTOR_SIZE, dtype=np.uint8)
+        self._state_vector_ranges = merge_ranges([(address, address + 1) for address in STATE_VECTOR_ADDRS])
+
+        # 티어별 갱신 스케줄
+        self.refresh_policy = refresh_policy or RefreshPolicy()
+        self._tier_regions = self.refresh_policy.tier_regions()
+        self._steps_since_warm = 0
+        self._warm_trigger_values = None
+        self.last_refreshed_tiers = ()  # 마지막 refresh()에서 복사한 티어 (스텝 타이밍 로그용)
+        self._tier_sections = self.refresh_policy.tier_sections()
+        self._tier_slices = {
+            tier: [(slice(start - WRAM_START, end - WRAM_START), bytes(end - start)) for start, end in regions]
+            for tier, regions in self._tier_regions.items()
+        }
+
+        # 변경 추적: 새 바이트를 _incoming에 받아 섹션별로 현재 스냅샷과 비교하고, 바뀐 섹션만 버전을 올려 반영합니다.
+        # (decoded_from 캐시 키, 반영 전에 발급된 상태 dict의 남은 섹션을 이전 바이트로 디코딩)
+        self._incoming = np.zeros(WRAM_SIZE, dtype=np.uint8)
+        self._incoming_view = memoryview(self._incoming)
+        self._section_slices = {
+            section: [slice(start - WRAM_START, end - WRAM_START) for start, end in ranges]
+            for section, ranges in SNAPSHOT_SECTIONS.items()
+        }
+        self._section_versions = dict.fromkeys(SNAPSHOT_SECTIONS, 0)
+        self._decode_cache = {}     # 메서드 이름 -> (섹션 버전, 결과, 읽은 구간)
+        self._changed_sections = set()
+        self._section_methods = {section: set() for section in SNAPSHOT_SECTIONS}  # 섹션 -> 그 섹션을 읽는 STATE_SECTIONS 메서드
+        for method in STATE_SECTIONS.values():
+            for section in getattr(type(self), method).sections:
+                self._section_methods[section].add(method)
+
+        # RAM 구독 (watch): 구간 바이트가 바뀐 스텝에만 콜백/이벤트가 발생합니다.
+        self._watches = {}
+        self.fired_watches = frozenset()  # 마지막 refresh()에서 값이 바뀐 watch 이름
+
+    # --- WRAM 스냅샷 ---
+    def refresh(self, tiers: tuple = None):
+        """
+        스냅샷 버퍼를 갱신합니다. env.step()마다 한 번 호출되며, 이후 모든 읽기는 버퍼에서 처리됩니다.
+        tiers를 주지 않으면 refresh_policy에 따라 hot은 항상, warm은 주기/트리거 바이트 변화 때,
+        cold는 첫 갱신 때만 복사합니다. 에피소드 경계에서는 refresh(REFRESH_TIERS)로 전체를 갱신합니다.
+        """
+        self._flag_bits = None
+        if not self.use_snapshot:
+            self.last_refreshed_tiers = REFRESH_TIERS
+            self._changed_sections = set(SNAPSHOT_SECTIONS)  # 비교할 이전 스냅샷이 없음
+            self.fired_watches = frozenset(self._watches)
+            return
+        if tiers is None:
+            tiers = self._scheduled_tiers()
+        elif self._tier_regions['warm']:
+            self._warm_trigger_values = self._read_warm_triggers()
+
+        first = not self._snapshot_valid
+        if self._lazy_fetch:
+            # 바이트는 디코더가 읽을 때 가져오고, 그때 이전 값과 비교해 섹션 버전을 올립니다. (_fetch)
+            for tier in tiers:
+                for sl, zeros in self._tier_slices[tier]:
+                    self._fresh[sl] = zeros
+        else:
+            for tier in tiers:
+                self._copy_regions(self._tier_regions[tier])
+        if 'warm' in tiers:
+            self._steps_since_warm = 0
+        self._snapshot_valid = True
+        self.last_refreshed_tiers = tuple(tiers)
+        if self._lazy_fetch:
+            self._changed_sections = set()
+            self._dispatch_watches()
+        else:
+            self._update_changed_sections(tiers, first)
+            self._flag_bits = None  # 반영 전 디코딩이 이전 프레임의 플래그 비트를 캐시했을 수 있음
+
+    @property
+    def changed_sections(self) -> frozenset:
+        """
+        마지막 refresh()에서 바이트가 바뀐 섹션.
+        지연 스냅샷(PyBoy 1.x)에서는 그 뒤 지금까지 읽은 바이트 기준입니다. (읽지 않은 바이트의 변화는 모름)
+        """
+        return frozenset(self._changed_sections)
+
+    def _update_changed_sections(self, tiers: tuple, force: bool = False):
+        """
+        _incoming에 복사한 섹션을 현재 스냅샷과 구간별로 비교해, 바뀐 섹션만 버전을 올리고 스냅샷에 반영합니다.
+        반영 전에 발급된 상태 dict 중 바뀐 섹션을 아직 디코딩하지 않은 것은 이전 바이트로 먼저 디코딩합니다.
+        """
+        new, old = self._incoming_view, self._wram_view
+        changed = [
+            section
+            for tier in tiers
+            for section in self._tier_sections[tier]
+            if force or any(new[sl] != old[sl] for sl in self._section_slices[section])
+        ]
+        self._decode_issued_states(changed)
+        for section in changed:
+            self._section_versions[section] += 1
+            for sl in self._section_slices[section]:
+                old[sl] = new[sl]
+        self._changed_sections = set(changed)
+        self._dispatch_watches()
+
+    # --- RAM 구독 ---
+    def watch(self, name: str, ranges: list[tuple[int, int]], callback=None) -> str:
+        """
+        RAM 구간 [start, end) 목록을 구독합니다. refresh()에서 해당 바이트가 바뀌면
+        name이 fired_watches에 들어가고, callback(name, old, new)이 호출됩니다. (old는 첫 관측 때 None)
+        구간은 스냅샷 섹션 안에 있어야 하며, 속한 섹션이 바뀐 스텝에만 비교합니다.
+        """
+        self._watches[name] = RamWatch(name, list(ranges), callback, sections_covering(ranges))
+        return name
+
+    def unwatch(self, name: str):
+        self._watches.pop(name, None)
+
+    def _dispatch_watches(self):
+        fired = []
+        changed = self._changed_sections
+        lazy = self._lazy_fetch
+        for watch in self._watches.values():
+            if lazy:
+                # 지연 스냅샷은 섹션 변경을 미리 알 수 없으므로 구독 구간을 읽어 직접 비교합니다.
+                for start, end in watch.ranges:
+                    self._fetch(start, end)
+            elif watch.value is not None and changed.isdisjoint(watch.sections):
+                continue
+            new = b''.join(self._wram_view[start - WRAM_START:end - WRAM_START] for start, end in watch.ranges)
+            if new == watch.value:
+                continue
+            old, watch.value = watch.value, new
+            fired.append(watch.name)
+            if watch.callback is not None:
+                watch.callback(watch.name, old, new)
+        self.fired_watches = frozenset(fired)
+
+    def section_changed(self, *sections: str) -> bool:
+        """마지막 refresh()에서 주어진 섹션 중 하나라도 바이트가 바뀌었는지 (보상 코드용 빠른 질의)"""
+        return not self._changed_sections.isdisjoint(sections)
+
+    def _scheduled_tiers(self) -> tuple:
+        """이번 스텝에 갱신할 티어를 정합니다."""
+        if not self._snapshot_valid:
+            if self._tier_regions['warm']:
+                self._warm_trigger_values = self._read_warm_triggers()
+            return REFRESH_TIERS
+        if not self._tier_regions['warm']:
+            return ('hot',)
+        self._steps_since_warm += 1
+        triggers = self._read_warm_triggers()
+        triggered = triggers != self._warm_trigger_values
+        self._warm_trigger_values = triggers
+        if triggered or self._steps_since_warm >= self.refresh_policy.warm_interval:
+            return ('hot', 'warm')
+        return ('hot',)
+
+    def _read_warm_triggers(self) -> tuple:
+        """warm 티어 트리거 바이트 (전투 종류, 맵 ID 등)를 라이브 메모리에서 읽습니다."""
+        return tuple(map(self.pyboy.get_memory_value, self.refresh_policy.warm_triggers))
+
+    def _copy_regions(self, regions: list[tuple[int, int]]):
+        for start, end in regions:
+            self._incoming[start - WRAM_START:end - WRAM_START] = self._bulk_memory[start:end]
+
+    def _fetch(self, start: int, end: int):
+        """
+        지연 스냅샷: 스냅샷 구간 [start, end) 중 마지막 refresh 이후 아직 읽지 않은 바이트를 라이브 메모리에서 읽어 채웁니다.
+        값이 바뀐 바이트의 섹션은 버전을 올리고 changed_sections에 넣습니다. (전체 복사 모드에서는 아무것도 하지 않음)
+        """
+        if not self._lazy_fetch:
+            return
+        if self._read_log is not None:
+            self._read_log.append((start, end))
+        lo, hi = start - WRAM_START, end - WRAM_START
+        fresh = self._fresh
+        if 0 not in fresh[lo:hi]:
+            return
+        read = self.pyboy.get_memory_value
+        wram = self._wram_view
+        changed = None
+        for offset in range(lo, hi):
+            if fresh[offset]:
+                continue
+            fresh[offset] = 1
+            value = read(offset + WRAM_START)
+            if value != wram[offset]:
+                wram[offset] = value
+                if changed is None:
+                    changed = set()
+                changed.add(self._offset_sections[offset])
+        if changed:
+            for section in changed:
+                self._section_versions[section] += 1
+            self._changed_sections |= changed
+
+    def _decode_issued_states(self, changed: list):
+        """아직 살아 있는 발급 상태 dict에서 changed 섹션을 읽는 남은 섹션을 디코딩합니다. (다 디코딩된 것은 목록에서 뺌)"""
+        if not self._issued_states:
+            return
+        methods = set()
+        for section in changed:
+            methods |= self._section_methods[section]
+        issued = []
+        for ref in self._issued_states:
+            state = ref()
+            if state is None:
+                continue
+            if methods:
+                state._decode_pending(methods)
+            if state.pending_sections:
+                issued.append(ref)
+        self._issued_states = issued
+
+    def _in_snapshot(self, address: int) -> bool:
+        offset = address - WRAM_START
+        return self._snapshot_valid and 0 <= offset < WRAM_SIZE and self._covered_view[offset]
+
     # --- 메모리 읽기 ---
     def _read_memory(self, address: int) -> int:
-        """메모리에서 1바이트 읽기"""
+        """메모리에서 1바이트 읽기 (스냅샷이 있으면 버퍼에서)"""
+        if self._in_snapshot(address):
+            self._fetch(address, address + 1)
+            return self._wram_view[address - WRAM_START]
         return self.pyboy.get_memory_value(address)
 
+    def _read_bytes(self, address: int, length: int) -> np.ndarray:
+        """연속된 바이트를 uint8 배열로 읽기 (스냅샷 구간이면 복사 없는 뷰)"""
+        offset = address - WRAM_START
+        if (self._snapshot_valid and 0 <= offset and offset + length <= WRAM_SIZE
+                and self._covered[offset:offset + length].all()):
+            self._fetch(address, address + length)
+            return self._wram[offset:offset + length]
+        return np.array([self._read_memory(address + i) for i in range(length)], dtype=np.uint8)
+
+    def _read_record(self, address: int, dtype: np.dtype, count: int = 1, fields: tuple = None) -> np.ndarray:
+        """
+        스키마 dtype 레코드 count개를 np.frombuffer 한 번으로 디코딩합니다.
+        스냅샷이 모든 필드 구간을 담고 있으면 복사 없는 뷰를, 아니면 필드 구간만 읽어 채운 배열을 반환합니다.
+        fields를 주면 그 필드들만 읽습니다. (다른 필드의 값은 정의되지 않음)
+        """
+        length = dtype.itemsize * count
+        offset = address - WRAM_START
+        key = (address, dtype, count, fields)
+        coverage = self._record_coverage.get(key)
+        if coverage is None:
+            ranges = record_byte_ranges(dtype, address, count, fields)
+            covered = 0 <= offset and offset + length <= WRAM_SIZE and all(
+                self._covered[start - WRAM_START:end - WRAM_START].all() for start, end in ranges
+            )
+            coverage = self._record_coverage[key] = (covered, ranges)
+        covered, ranges = coverage
+        if self._snapshot_valid and covered:
+            for start, end in ranges:
+                self._fetch(start, end)
+            return np.frombuffer(self._wram, dtype=dtype, count=count, offset=offset)
+
+        raw = np.zeros(length, dtype=np.uint8)
+        for start, end in ranges:
+            raw[start - address:end - address] = [self._read_memory(addr) for addr in range(start, end)]
+        return np.frombuffer(raw, dtype=dtype, count=count)
+
     def _read_word_big_endian(self, address: int) -> int:
         """2바이트를 빅엔디안으로 읽기"""
         return (self._read_memory(address) << 8) + self._read_memory(address + 1)
@@ -565,16 +1582,18 @@ class GameState:
     def _read_bcd(self, address: int, num_bytes: int) -> int:
         """BCD 형식으로 읽기 (돈 등)"""
         value = 0
-        for i in range(num_bytes):
-            byte = self._read_memory(address + i)
+        for byte in self._read_bytes(address, num_bytes).tolist():
             value = value * 100 + ((byte >> 4) * 10 + (byte & 0x0F))
         return value
 
     def _read_string(self, start_address: int, max_len: int = 10) -> str:
         """문자열 읽기 (0x50이 종료 문자)"""
+        return self._decode_string(self._read_bytes(start_address, max_len))
+
+    def _decode_string(self, codes: np.ndarray) -> str:
+        """게임 문자 코드 배열을 문자열로 변환 (0x50이 종료 문자)"""
         chars = []
-        for i in range(max_len):
-            char_code = self._read_memory(start_address + i)
+        for char_code in codes.tolist():
             if char_code == 0x50:  # 종료 문자
                 break
             # 간단한 문자 매핑 (실제로는 더 복잡한 매핑 필요)
@@ -589,6 +1608,19 @@ class GameState:
         return "".join(chars)
 
     # --- 플래그 체크 (공식 방식) ---
+    def _get_flag_bits(self) -> np.ndarray:
+        """플래그 영역 전체를 np.unpackbits로 한 번에 디코딩합니다. (refresh마다 한 번)"""
+        if self._flag_bits is None:
+            self._flag_bits = np.unpackbits(self._read_bytes(FLAGS_BASE_ADDR, FLAG_BYTES), bitorder='little')
+        elif self._read_log is not None:
+            self._read_log.append((FLAGS_BASE_ADDR, FLAGS_BASE_ADDR + FLAG_BYTES))  # 디코딩 캐시 검증용
+        return self._flag_bits
+
+    def _gather_flag_group(self, group: str) -> dict:
+        """FLAG_GROUPS에 정의된 플래그들을 비트 배열에서 한 번에 모읍니다."""
+        keys, indices = FLAG_GROUP_INDICES[group]
+        return dict(zip(keys, self._get_flag_bits()[indices].astype(bool).tolist()))
+
     def _check_flag(self, flag_id: int) -> bool:
         """
         공식 플래그 시스템으로 플래그 상태 확인
@@ -600,6 +1632,10 @@ class GameState:
             bool: 플래그가 설정되어 있으면 True
         """
         try:
+            bit_index = flag_bit_index(flag_id)
+            if 0 <= bit_index < FLAG_BYTES * 8:
+                return bool(self._get_flag_bits()[bit_index])
+
             addr, bit = flag_to_address_bit(flag_id)
             
             # 주소 범위 체크
@@ -644,86 +1680,70 @@ class GameState:
         }
 
     # --- 플레이어 정보 ---
+    def _get_player_record(self) -> np.void:
+        return self._read_record(PLAYER_BASE, PLAYER_DTYPE)[0]
+
+    @decoded_from('player', 'names')
     def _get_player_info(self) -> dict:
-        johto_badges_byte = self._read_memory(PLAYER_ADDRS['johto_badges'])
-        kanto_badges_byte = self._read_memory(PLAYER_ADDRS['kanto_badges'])
+        player = self._get_player_record()
+        johto_badges_byte = int(player['johto_badges'])
+        kanto_badges_byte = int(player['kanto_badges'])
         
         return {
-            'player_id': self._read_word_little_endian(PLAYER_ADDRS['player_id']),
-            'player_name': self._read_string(PLAYER_ADDRS['player_name']),
-            'rival_name': self._read_string(PLAYER_ADDRS['rival_name']),
-            'money': self._read_bcd(PLAYER_ADDRS['money'], 3),
+            'player_id': int(player['player_id']),
+            'player_name': self._decode_string(player['player_name']),
+            'rival_name': self._decode_string(player['rival_name']),
+            'money': int(bcd_to_int(player['money'])),
             'johto_badges_byte': johto_badges_byte,
             'johto_badges_count': bin(johto_badges_byte).count('1'),
             'kanto_badges_byte': kanto_badges_byte,
             'kanto_badges_count': bin(kanto_badges_byte).count('1'),
-            'sprite': self._read_memory(PLAYER_ADDRS['sprite']),
-            'clothes': self._read_memory(PLAYER_ADDRS['clothes']),
-            'on_bike': self._read_memory(PLAYER_ADDRS['on_bike']) != 0,
-            'repel_steps': self._read_memory(PLAYER_ADDRS['repel_steps']),
+            'sprite': int(player['sprite']),
+            'clothes': int(player['clothes']),
+            'on_bike': int(player['on_bike']) != 0,
+            'repel_steps': int(player['repel_steps']),
         }
 
+    @decoded_from('location')
     def _get_location_info(self) -> dict:
+        player = self._get_player_record()
         return {
-            'map_bank': self._read_memory(PLAYER_ADDRS['map_bank']),
-            'map_id': self._read_memory(PLAYER_ADDRS['map_id']),
-            'x_coord': self._read_memory(PLAYER_ADDRS['x_coord']),
-            'y_coord': self._read_memory(PLAYER_ADDRS['y_coord']),
-            'x_coord_detailed': self._read_memory(PLAYER_ADDRS['x_coord_detailed']),
-            'y_coord_detailed': self._read_memory(PLAYER_ADDRS['y_coord_detailed']),
+            'map_bank': int(player['map_bank']),
+            'map_id': int(player['map_id']),
+            'x_coord': int(player['x_coord']),
+            'y_coord': int(player['y_coord']),
+            'x_coord_detailed': int(player['x_coord_detailed']),
+            'y_coord_detailed': int(player['y_coord_detailed']),
         }
 
     # --- 파티 정보 ---
+    def _get_party_records(self) -> np.ndarray:
+        """실제 파티 수만큼의 POKEMON_DTYPE 레코드를 반환합니다. (빈 슬롯과 디코더가 쓰지 않는 필드는 읽지 않음)"""
+        count = min(int(self._read_record(PARTY_BASE, PARTY_DTYPE, fields=('count',))[0]['count']), 6)  # 최대 6마리
+        return self._read_record(PARTY_ADDRS['data_start'], POKEMON_DTYPE, count, fields=PARTY_MEMBER_FIELDS)
+
     def _get_party_info(self) -> list[dict]:
-        party_count = self._read_memory(PARTY_ADDRS['count'])
-        party = []
+        records = self._get_party_records()
         
-        for i in range(min(party_count, 6)):  # 최대 6마리
-            start_addr = PARTY_ADDRS['data_start'] + i * POKEMON_DATA_SIZE
-            
-            # 기본 정보
-            species_id = self._read_memory(start_addr + POKEMON_OFFSETS['species_id'])
-            level = self._read_memory(start_addr + POKEMON_OFFSETS['level'])
-            
-            # HP 정보
-            current_hp = self._read_word_big_endian(start_addr + POKEMON_OFFSETS['hp'])
-            max_hp = self._read_word_big_endian(start_addr + POKEMON_OFFSETS['max_hp'])
-            
-            # 스탯 정보
-            attack = self._read_word_big_endian(start_addr + POKEMON_OFFSETS['attack'])
-            defense = self._read_word_big_endian(start_addr + POKEMON_OFFSETS['defense'])
-            speed = self._read_word_big_endian(start_addr + POKEMON_OFFSETS['speed'])
-            sp_attack = self._read_word_big_endian(start_addr + POKEMON_OFFSETS['sp_attack'])
-            sp_defense = self._read_word_big_endian(start_addr + POKEMON_OFFSETS['sp_defense'])
-            
-            # 경험치 (3바이트)
-            exp_addr = start_addr + POKEMON_OFFSETS['experience']
-            experience = (self._read_memory(exp_addr) << 16) + \
-                        (self._read_memory(exp_addr + 1) << 8) + \
-                        self._read_memory(exp_addr + 2)
-            
-            # 개체값
-            iv_byte1 = self._read_memory(start_addr + POKEMON_OFFSETS['attack_defense_iv'])
-            iv_byte2 = self._read_memory(start_addr + POKEMON_OFFSETS['speed_special_iv'])
-            
-            attack_iv = (iv_byte1 >> 4) & 0xF
-            defense_iv = iv_byte1 & 0xF
-            speed_iv = (iv_byte2 >> 4) & 0xF
-            special_iv = iv_byte2 & 0xF
-            
-            # 기술들
-            moves = []
-            for j in range(4):
-                move = self._read_memory(start_addr + POKEMON_OFFSETS['moves'] + j)
-                moves.append(move)
-            
-            # 기술 PP
-            pp_moves = []
-            for j in range(4):
-                pp = self._read_memory(start_addr + POKEMON_OFFSETS['pp_moves'] + j)
-                pp_moves.append(pp)
-            
-            pokemon = {
+        # 경험치 (3바이트), 개체값 (4비트씩)
+        experience = be_uint(records['experience']).tolist()
+        attack_iv, defense_iv = split_nibbles(records['attack_defense_iv'])
+        speed_iv, special_iv = split_nibbles(records['speed_special_iv'])
+        
+        columns = zip(
+            records['species_id'].tolist(), records['level'].tolist(),
+            records['hp'].tolist(), records['max_hp'].tolist(),
+            records['attack'].tolist(), records['defense'].tolist(), records['speed'].tolist(),
+            records['sp_attack'].tolist(), records['sp_defense'].tolist(), experience,
+            attack_iv.tolist(), defense_iv.tolist(), speed_iv.tolist(), special_iv.tolist(),
+            records['moves'].tolist(), records['pp_moves'].tolist(),
+            records['happiness'].tolist(), records['pokerus'].tolist(),
+            records['status'].tolist(), records['item_held'].tolist(),
+        )
+        party = []
+        for (species_id, level, current_hp, max_hp, attack, defense, speed, sp_attack, sp_defense,
+             exp, atk_iv, def_iv, spd_iv, spc_iv, moves, pp_moves, happiness, pokerus, status, item_held) in columns:
+            party.append({
                 'species_id': species_id,
                 'level': level,
                 'current_hp': current_hp,
@@ -733,39 +1753,71 @@ class GameState:
                 'speed': speed,
                 'sp_attack': sp_attack,
                 'sp_defense': sp_defense,
-                'experience': experience,
+                'experience': exp,
                 'ivs': {
-                    'attack': attack_iv,
-                    'defense': defense_iv,
-                    'speed': speed_iv,
-                    'special': special_iv
+                    'attack': atk_iv,
+                    'defense': def_iv,
+                    'speed': spd_iv,
+                    'special': spc_iv
                 },
                 'moves': moves,
                 'pp_moves': pp_moves,
-                'happiness': self._read_memory(start_addr + POKEMON_OFFSETS['happiness']),
-                'pokerus': self._read_memory(start_addr + POKEMON_OFFSETS['pokerus']),
-                'status': self._read_word_big_endian(start_addr + POKEMON_OFFSETS['status']),
-                'item_held': self._read_memory(start_addr + POKEMON_OFFSETS['item_held']),
-            }
-            party.append(pokemon)
+                'happiness': happiness,
+                'pokerus': pokerus,
+                'status': status,
+                'item_held': item_held,
+            })
         
         return party
 
+    def get_party_array(self) -> np.ndarray:
+        """
+        배치 소비자용 평탄화 파티 배열 (6, len(PARTY_ARRAY_COLUMNS)) int32.
+        열 순서는 PARTY_ARRAY_COLUMNS, 빈 슬롯은 0으로 채워집니다.
+        """
+        records = self._get_party_records()
+        out = np.zeros((6, len(PARTY_ARRAY_COLUMNS)), dtype=np.int32)
+        n = len(records)
+        attack_iv, defense_iv = split_nibbles(records['attack_defense_iv'])
+        speed_iv, special_iv = split_nibbles(records['speed_special_iv'])
+        out[:n, 0] = records['species_id']
+        out[:n, 1] = records['level']
+        out[:n, 2] = records['hp']
+        out[:n, 3] = records['max_hp']
+        out[:n, 4] = records['attack']
+        out[:n, 5] = records['defense']
+        out[:n, 6] = records['speed']
+        out[:n, 7] = records['sp_attack']
+        out[:n, 8] = records['sp_defense']
+        out[:n, 9] = be_uint(records['experience'])
+        out[:n, 10] = attack_iv
+        out[:n, 11] = defense_iv
+        out[:n, 12] = speed_iv
+        out[:n, 13] = special_iv
+        out[:n, 14:18] = records['moves']
+        out[:n, 18:22] = records['pp_moves']
+        out[:n, 22] = records['happiness']
+        out[:n, 23] = records['pokerus']
+        out[:n, 24] = records['status']
+        out[:n, 25] = records['item_held']
+        return out
+
     # --- 이벤트 플래그 (공식 시스템 사용) ---
+    @decoded_from('event_flags')
     def _get_event_flags_info(self) -> dict:
-        """모든 정의된 이벤트 플래그 상태 확인"""
-        flags = {}
-        for name, flag_id in EVENT_FLAGS.items():
-            flags[name] = self._check_flag(flag_id)
-        return flags
+        """모든 정의된 이벤트 플래그 상태 확인 (미리 계산된 인덱스로 한 번에 gather)"""
+        values = self._get_flag_bits()[EVENT_FLAG_BIT_INDICES].astype(bool).tolist()
+        return dict(zip(EVENT_FLAG_NAMES, values))
 
+    @decoded_from('event_flags', 'party')
     def get_starter_info(self) -> dict:
         """스타터 포켓몬 관련 이벤트 요약 (공식 플래그 사용)"""
         # 공식 플래그로 먼저 확인
-        starter_received = self._check_flag(EVENT_FLAGS['starter_received'])
-        cyndaquil = self._check_flag(EVENT_FLAGS['starter_cyndaquil'])
-        totodile = self._check_flag(EVENT_FLAGS['starter_totodile'])  
-        chikorita = self._check_flag(EVENT_FLAGS['starter_chikorita'])
+        flags = self._gather_flag_group('starter')
+        starter_received = flags['starter_received']
+        cyndaquil = flags['cyndaquil_flag']
+        totodile = flags['totodile_flag']
+        chikorita = flags['chikorita_flag']
         
         starter = None
         if cyndaquil:
@@ -777,11 +1829,11 @@ class GameState:
         
         # 파티에 포켓몬이 있는지로도 판단
         party_count = self._read_memory(PARTY_ADDRS['count'])
-        has_pokemon = self._check_flag(EVENT_FLAGS['got_starter_pokeball'])
+        has_pokemon = flags['has_pokemon_flag']
         
         # 백업 방법: 파티에서 첫 포켓몬 확인
         if party_count > 0 and not starter:
-            first_species = self._read_memory(PARTY_ADDRS['data_start'])
+            first_species = self._read_memory(PARTY_ADDRS['data_start'] + POKEMON_OFFSETS['species_id'])
             if first_species == 155:  # Cyndaquil
                 starter = "Cyndaquil"
             elif first_species == 158:  # Totodile
@@ -802,71 +1854,66 @@ class GameState:
             }
         }
 
+    @decoded_from('event_flags')
     def get_rocket_events_info(self) -> dict:
         """로켓단 관련 이벤트들 요약"""
-        return {
-            "slowpoke_well_defeated": self._check_flag(EVENT_FLAGS['rocket_slowpoke_well_defeated']),
-            "radio_tower_attacked": self._check_flag(EVENT_FLAGS['rocket_radio_tower_attacked']),
-            "radio_tower_cleared": self._check_flag(EVENT_FLAGS['rocket_radio_tower_cleared']),
-            "mahogany_cleared": self._check_flag(EVENT_FLAGS['rocket_mahogany_cleared']),
-            "goldenrod_cleared": self._check_flag(EVENT_FLAGS['rocket_goldenrod_cleared']),
-            "left_goldenrod": self._check_flag(EVENT_FLAGS['rocket_left_goldenrod']),
-            "mahogany_controls": self._check_flag(EVENT_FLAGS['rocket_mahogany_controls']),
-        }
+        return self._gather_flag_group('rocket_events')
 
+    @decoded_from('event_flags')
     def get_elite4_info(self) -> dict:
         """Elite 4 진행 상황"""
-        return {
-            "will_defeated": self._check_flag(EVENT_FLAGS['elite4_will']),
-            "koga_defeated": self._check_flag(EVENT_FLAGS['elite4_koga']),
-            "bruno_defeated": self._check_flag(EVENT_FLAGS['elite4_bruno']),
-            "karen_defeated": self._check_flag(EVENT_FLAGS['elite4_karen']),
-            "lance_defeated": self._check_flag(EVENT_FLAGS['champion_lance']),
-        }
+        return self._gather_flag_group('elite4_progress')
 
+    @decoded_from('event_flags')
     def get_legendary_pokemon_info(self) -> dict:
         """전설 포켓몬 관련 정보"""
-        return {
-            "red_gyarados_battled": self._check_flag(EVENT_FLAGS['battled_red_gyarados']),
-            "sudowoodo_battled": self._check_flag(EVENT_FLAGS['battled_sudowoodo']),
-        }
+        return self._gather_flag_group('legendary_pokemon')
 
+    @decoded_from('event_flags')
     def get_rival_encounters_info(self) -> dict:
         """라이벌과의 만남 정보"""
-        return {
-            "met_cherrygrove": self._check_flag(EVENT_FLAGS['rival_met_cherrygrove']),
-            "met_goldenrod_underground": self._check_flag(EVENT_FLAGS['rival_met_goldenrod_underground']),
-            "met_sprout_tower": self._check_flag(EVENT_FLAGS['rival_met_sprout_tower']),
-            "met_burned_tower": self._check_flag(EVENT_FLAGS['rival_met_burned_tower']),
-            "in_dragons_den": self._check_flag(EVENT_FLAGS['rival_in_dragons_den']),
-            "stolen_pokemon": self._check_flag(EVENT_FLAGS['rival_stolen_pokemon']),
-        }
+        return self._gather_flag_group('rival_encounters')
 
     # --- 전투 정보 ---
+    @decoded_from('battle')
     def _get_battle_info(self) -> dict:
         battle_type = self._read_memory(BATTLE_ADDRS['battle_type'])
         if battle_type == 0:
             return None
+        battle = self._read_record(BATTLE_BASE, BATTLE_DTYPE)[0]
             
         return {
             'battle_type': battle_type,
-            'enemy_species': self._read_memory(BATTLE_ADDRS['enemy_species']),
-            'enemy_level': self._read_memory(BATTLE_ADDRS['enemy_level']),
-            'enemy_hp': self._read_word_big_endian(BATTLE_ADDRS['enemy_hp']),
-            'enemy_max_hp': self._read_word_big_endian(BATTLE_ADDRS['enemy_max_hp']),
-            'enemy_status': self._read_memory(BATTLE_ADDRS['enemy_status']),
+            'enemy_species': int(battle['enemy_species']),
+            'enemy_level': int(battle['enemy_level']),
+            'enemy_hp': int(battle['enemy_hp']),
+            'enemy_max_hp': int(battle['enemy_max_hp']),
+            'enemy_status': int(battle['enemy_status']),
+        }
+
+    def get_your_battle_info(self) -> dict:
+        """전투 중인 내 포켓몬 정보 (YOUR_BATTLE_ADDRS 블록)"""
+        mine = self._read_record(YOUR_BATTLE_BASE, YOUR_BATTLE_DTYPE)[0]
+        return {
+            'item_held': int(mine['item_held']),
+            'moves': mine['moves'].tolist(),
+            'pp_moves': mine['pp_moves'].tolist(),
+            'status': int(mine['status']),
+            'hp': int(mine['hp']),
+            'types': mine['types'].tolist(),
+            'substitute': int(mine['substitute']),
+            'money_earned': int(mine['money_earned']),
+            'experience_given': self._read_word_big_endian(YOUR_BATTLE_ADDRS['experience_given']),
+            'current_attack': int(mine['current_attack']),
         }
 
     # --- 인벤토리 정보 ---
+    @decoded_from('bag')
     def _get_inventory_info(self) -> dict:
-        item_count = self._read_memory(INVENTORY_ADDRS['item_count'])
-        items = []
-        
-        for i in range(min(item_count, 20)):  # 최대 20개 아이템
-            item_addr = INVENTORY_ADDRS['items_start'] + i * 2
-            item_id = self._read_memory(item_addr)
-            item_amount = self._read_memory(item_addr + 1)
-            items.append({'id': item_id, 'amount': item_amount})
+        item_count = self._read_memory(BAG_ADDRS['item_count'])
+        slots = self._read_record(BAG_ADDRS['items_start'], ITEM_SLOT, min(item_count, 20))  # 최대 20개 아이템
+        items = [{'id': item_id, 'amount': amount}
+                 for item_id, amount in zip(slots['id'].tolist(), slots['amount'].tolist())]
         
         return {
             'item_count': item_count,
@@ -874,6 +1921,7 @@ class GameState:
         }
 
     # --- 상태 체크 ---
+    @decoded_from('game_mode')
     def is_in_menu(self) -> bool:
         # 게임 모드 체크 (정확한 값은 테스트 필요)
         game_mode = self._read_memory(GAME_STATE_ADDRS.get('game_mode', 0xD11E))
@@ -884,73 +1932,117 @@ class GameState:
         return battle_type != 0
 
     # --- 포켓덱스 정보 ---
+    @decoded_from('pokedex')
     def get_pokedex_info(self) -> dict:
         """포켓덱스 정보 (seen/owned 개수)"""
-        owned_count = 0
-        seen_count = 0
-        
-        # Owned 개수 계산
-        for addr in range(POKEDEX_ADDRS['owned_start'], POKEDEX_ADDRS['owned_end'] + 1):
-            byte_val = self._read_memory(addr)
-            owned_count += bin(byte_val).count('1')
-        
-        # Seen 개수 계산    
-        for addr in range(POKEDEX_ADDRS['seen_start'], POKEDEX_ADDRS['seen_end'] + 1):
-            byte_val = self._read_memory(addr)
-            seen_count += bin(byte_val).count('1')
-            
+        # Owned/Seen 개수 계산 (비트 popcount)
+        pokedex = self._read_record(POKEDEX_BASE, POKEDEX_DTYPE)[0]
+        owned_count = int(np.unpackbits(pokedex['owned_start']).sum())
+        seen_count = int(np.unpackbits(pokedex['seen_start']).sum())
+
         return {
             'owned_count': owned_count,
             'seen_count': seen_count,
         }
 
     # ✨ 현재 맵의 연결 정보를 가져오는 새 메서드 추가
-    def _get_current_map_connections(self) -> list[dict]:
+    @decoded_from('location')
+    def _get_current_map_connections(self) -> tuple[dict, ...]:
         """현재 위치한 맵의 출구 정보를 ROM에서 읽어옵니다."""
         loc = self._get_location_info()
-        connections_data = self.rom_mapper.get_map_connections(loc['map_bank'], loc['map_id'])
-        # dataclass 객체를 일반 dict로 변환하여 반환
-        return [c.__dict__ for c in connections_data]
+        return self.rom_mapper.get_map_connection_dicts(loc['map_bank'], loc['map_id'])
     
 
 
     # --- 최종 상태 dict ---
-    def get_state_dict(self) -> dict:
+    @decoded_from('party')
+    def _get_party_section(self) -> dict:
         party_list = self._get_party_info()
+        return {
+            'count': len(party_list),
+            'pokemon': party_list,
+            'party_level_sum': sum(p.get('level', 0) for p in party_list),
+            'party_hp_sum': sum(p.get('current_hp', 0) for p in party_list),
+        }
+
+    def get_state_dict(self, refresh: bool = True, lazy: bool = True, refresh_tiers: tuple = None) -> MutableMapping:
+        """
+        현재 프레임의 상태를 돌려줍니다.
+        lazy=True면 LazyStateDict를 돌려주며, 섹션은 실제로 접근할 때만 디코딩됩니다.
+        (is_in_battle / battle_info는 키 존재 여부가 걸려 있어 바로 디코딩)
+        lazy=False거나 스냅샷을 쓰지 않거나 지연 스냅샷(PyBoy 1.x)이면 모든 섹션을 디코딩한 일반 dict를 돌려줍니다.
+        (라이브 메모리나 아직 읽지 않은 바이트는 다음 프레임에 프레임 단위로 고정할 수 없음)
+        refresh_tiers는 refresh()에 그대로 전달됩니다. (None이면 refresh_policy 스케줄)
+        """
+        if refresh:
+            self.refresh(refresh_tiers)
         battle_info = self._get_battle_info()
         is_battle = battle_info is not None
 
-        party_level_sum = sum(p.get('level',0) for p in party_list)
-        party_hp_sum = sum(p.get('current_hp',0) for p in party_list)
-        
-        state = {
-            'is_in_battle': is_battle,
-            'is_in_menu': self.is_in_menu(),
-            'location': self._get_location_info(),
-            'player_info': self._get_player_info(),
-            'party_info': {
-                'count': len(party_list),
-                'pokemon': party_list,
-                'party_level_sum': party_level_sum,
-                'party_hp_sum': party_hp_sum,
-            },
-            # ✨ 최종 상태에 맵 연결 정보를 추가합니다.
-            'map_connections': self._get_current_map_connections(),
-            'event_statuses': self._get_event_flags_info(),
-            'starter_info': self.get_starter_info(),
-            'rocket_events': self.get_rocket_events_info(),
-            'elite4_progress': self.get_elite4_info(),
-            'legendary_pokemon': self.get_legendary_pokemon_info(),
-            'rival_encounters': self.get_rival_encounters_info(),
-            'pokedex': self.get_pokedex_info(),
-            'inventory': self._get_inventory_info(),
-        }
-
+        values = {'is_in_battle': is_battle}
+        keys = ['is_in_battle', *STATE_SECTIONS]
         if is_battle:
-            state['battle_info'] = battle_info
+            values['battle_info'] = battle_info
+            keys.append('battle_info')
+        state = LazyStateDict(self, values, dict(STATE_SECTIONS), keys)
 
+        if not (lazy and self.use_snapshot) or self._lazy_fetch:
+            return state.to_dict()
+        self._issued_states.append(weakref.ref(state))
         return state
 
+    def fill_state_vector(self, out: np.ndarray) -> np.ndarray:
+        """
+        관측 상태 벡터(STATE_VECTOR_*)를 상태 dict를 거치지 않고 스냅샷 버퍼에서 바로 계산해 out (float32, 5)에 씁니다.
+        스냅샷이 있으면 np.take로 모아 새 배열을 할당하지 않습니다.
+        """
+        raw = self._state_vector_raw
+        if self._state_vector_in_snapshot and self._snapshot_valid:
+            for start, end in self._state_vector_ranges:
+                self._fetch(start, end)
+            self._wram.take(self._state_vector_offsets, out=raw)
+        else:
+            for i, address in enumerate(STATE_VECTOR_ADDRS):
+                raw[i] = self._read_memory(address)
+        raw[STATE_VECTOR_POPCOUNT] = _POPCOUNT[raw[STATE_VECTOR_POPCOUNT]]
+        np.multiply(raw, STATE_VECTOR_SCALE, out=out)
+        np.add(out, STATE_VECTOR_OFFSET, out=out)
+        return out
+
+    def get_compact_state(self, refresh: bool = False) -> bytes:
+        """
+        현재 스냅샷을 COMPACT_STATE_DTYPE 레이아웃의 bytes로 직렬화합니다. (info 전송용, CompactState로 읽기)
+        디코더 캐시를 그대로 쓰므로 get_state_dict() 직후에 부르면 추가 디코딩이 거의 없습니다.
+        """
+        if refresh:
+            self.refresh()
+        record = np.zeros((), dtype=COMPACT_STATE_DTYPE)
+        loc = self._get_location_info()
+        player = self._get_player_info()
+        party = self._get_party_section()
+        battle = self._get_battle_info()
+        event_bits = self._get_flag_bits()[EVENT_FLAG_BIT_INDICES]
+
+        record['map_bank'] = loc['map_bank']
+        record['map_id'] = loc['map_id']
+        record['x_coord'] = loc['x_coord']
+        record['y_coord'] = loc['y_coord']
+        record['is_in_battle'] = battle is not None
+        record['is_in_menu'] = self.is_in_menu()
+        record['johto_badges_count'] = player['johto_badges_count']
+        record['kanto_badges_count'] = player['kanto_badges_count']
+        record['money'] = player['money']
+        record['party_count'] = party['count']
+        record['party_level_sum'] = party['party_level_sum']
+        record['party_hp_sum'] = party['party_hp_sum']
+        if battle is not None:
+            record['enemy_species'] = battle['enemy_species']
+            record['enemy_level'] = battle['enemy_level']
+            record['enemy_hp'] = battle['enemy_hp']
+        record['events_completed'] = int(event_bits.sum())
+        record['event_bits'] = np.packbits(event_bits, bitorder='little')
+        return record.tobytes()
+
     # --- 디버그용 함수들 ---
     def debug_memory_range(self, start_addr: int, end_addr: int) -> dict:
         """특정 메모리 범위의 값들을 확인 (디버깅용)"""
@@ -0,0 +1,51 @@
+# observation.py
+"""
+PokemonGoldEnv 관측 조립기. 화면/타일/상태 벡터 버퍼를 미리 할당해 두고 매 스텝 그 버퍼에 채워 넣어,
+환경 스텝 루프에서 관측을 만들 때 새 배열을 할당하지 않습니다.
+"""
+import numpy as np
+
+from game_state import STATE_VECTOR_SIZE
+
+
+class ObservationBuilder:
+    """
+    obs_mode별 관측 dict를 조립합니다.
+    build()는 매번 같은 dict와 같은 버퍼(뷰)를 돌려주므로, 다음 스텝 이후에도 값이 필요하면 복사해야 합니다.
+    build(out=...)에 호출 측 버퍼 dict(예: 공유 메모리)를 주면 그 버퍼에 바로 씁니다.
+    """
+    def __init__(self, manager, state_reader, obs_mode: str = 'pixels', global_map=None):
+        self.manager = manager
+        self.state_reader = state_reader
+        self.obs_mode = obs_mode
+        self.global_map = global_map
+        self.state = np.zeros(STATE_VECTOR_SIZE, dtype=np.float32)
+        self._obs = {}
+
+    def build(self, out: dict = None) -> dict:
+        if out is None:
+            return self._build_views()
+        return self._build_into(out)
+
+    def _build_views(self) -> dict:
+        obs = self._obs
+        if self.obs_mode == 'tiles':
+            obs["tiles"], obs["sprites"] = self.manager.get_tile_observation()
+        else:
+            obs["image"] = self.manager.get_screen_gray()
+        obs["state"] = self.state_reader.fill_state_vector(self.state)
+        if self.global_map is not None:
+            obs["explored"] = self.global_map.canvas
+        return obs
+
+    def _build_into(self, out: dict) -> dict:
+        if self.obs_mode == 'tiles':
+            tiles, sprites = self.manager.get_tile_observation()
+            np.copyto(out["tiles"], tiles)
+            np.copyto(out["sprites"], sprites)
+        else:
+            self.manager.get_screen_gray(out=out["image"])
+        self.state_reader.fill_state_vector(out["state"])
+        if self.global_map is not None:
+            np.copyto(out["explored"], self.global_map.canvas)
+        return out
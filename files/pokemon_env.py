@@ -1,42 +1,96 @@
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
+import time
 from collections import deque
 
-from game_manager import GameManager
-from game_state import GameState
+from game_manager import GameManager, MACRO_ACTIONS, TILE_ROWS, TILE_COLS, OAM_SPRITES
+from game_state import GameState, RefreshPolicy, REFRESH_TIERS, WATCH_RANGES, STATE_VECTOR_SIZE
+from exploration import ExplorationMap, GlobalExplorationCanvas, NEW_MAP, NEW_TILE
+from observation import ObservationBuilder
 from skill_library import Skill, LevelUpSkill
 
-# 각 보상 요소에 대한 가중치 설정 (하이퍼파라미터)
-REWARD_CONFIG = {
-    'event': 10.0,
-    'badge': 50.0,
-    'new_map': 5.0,
-    'exploration': 0.1,
-    'level_up': 2.0,
-    'hp_penalty': -0.01,
-}
-
 MAX_EPISODE_STEPS = 131072
 
+# step()이 돌려주는 info 형식
+#   none        : {} (SB3가 넣는 terminal_observation 등만)
+#   summary     : 맵/좌표/배지/레벨 합/HP 합/전투 여부 등 스칼라 몇 개
+#   compact     : {'compact_state': bytes} (game_state.CompactState로 읽기), 에피소드 끝에는 전체 상태
+#   episode_end : 에피소드가 끝나는 스텝에만 전체 상태, 나머지는 {}
+#   full        : 매 스텝 전체 상태 dict
+INFO_MODES = ('none', 'summary', 'compact', 'episode_end', 'full')
+
+# 관측 형식
+#   pixels : "image" (1, H, W) 흑백 화면
+#   tiles  : "tiles" (1, 18, 20) 화면 타일 ID + "sprites" (40, 4) OAM 테이블. 화면을 전혀 렌더링하지 않습니다.
+OBS_MODES = ('pixels', 'tiles')
+GLOBAL_MAP_SHAPE = (64, 80)   # global_map=True일 때 "explored" 관측 (1, H, W) 크기
+
 class PokemonGoldEnv(gym.Env):
-    def __init__(self, rom_path: str, state_path: str = None, render_mode: str = None):
+    def __init__(self, rom_path: str, state_path: str = None, render_mode: str = None,
+                 refresh_policy: RefreshPolicy = None, info_mode: str = 'compact',
+                 screen_downsample: int = 1, screen_crop: tuple = None, obs_mode: str = 'pixels',
+                 fast_forward_frames: int = 0, fast_forward_settle: int = None, fast_options: bool = False,
+                 macro_actions: bool = False, global_map: bool = False):
         super().__init__()
         
         self.metadata = {'render.modes': ['rgb_array'], 'render_fps': 4}
         self.render_mode = render_mode
 
         self.initial_state_path = state_path
-        self.manager = GameManager(rom_path, state_path=state_path, headless=True)
-        self.state_reader = GameState(self.manager.pyboy, rom_path=rom_path)
+        if info_mode not in INFO_MODES:
+            raise ValueError(f"알 수 없는 info_mode '{info_mode}' (가능한 값: {INFO_MODES})")
+        self.info_mode = info_mode
+        if obs_mode not in OBS_MODES:
+            raise ValueError(f"알 수 없는 obs_mode '{obs_mode}' (가능한 값: {OBS_MODES})")
+        self.obs_mode = obs_mode
+        # fast_forward_frames > 0이면 액션 후 게임이 입력을 기다릴 때까지(최대 이 프레임 수) 더 진행합니다.
+        # fast_forward_settle은 입력 대기로 판단하는 정지 프레임 수입니다. None이면 글자 속도에 맞춰 정하고(빠름 2 ~ 느림 6),
+        # 직접 줄 때는 글자 사이 지연(빠름 1, 보통 3, 느림 5프레임)보다 길어야 대사 도중에 멈추지 않습니다.
+        self.fast_forward_frames = fast_forward_frames
+        self.fast_forward_settle = fast_forward_settle
+        self.frame_skip = 4
+        # screen_downsample=2면 72x80 관측, screen_crop=(위, 아래, 왼쪽, 오른쪽) 픽셀만큼 잘라냄
+        # fast_options=True면 리셋할 때마다 글자 속도 '빠르게', 전투 애니메이션 '끄기'를 강제합니다.
+        self.manager = GameManager(rom_path, state_path=state_path, headless=True,
+                                   screen_downsample=screen_downsample, screen_crop=screen_crop,
+                                   fast_options=fast_options)
+        # refresh_policy=None이면 모든 RAM 섹션을 매 스텝 갱신합니다. (RefreshPolicy.tiered()로 티어 갱신)
+        self.state_reader = GameState(self.manager.pyboy, rom_path=rom_path, refresh_policy=refresh_policy)
+        # 보상 요소들은 RAM 구간을 구독하고, 해당 바이트가 바뀐 스텝에만 계산됩니다.
+        for name, ranges in WATCH_RANGES.items():
+            self.state_reader.watch(name, ranges)
         
-        self.action_space = spaces.Discrete(len(self.manager.action_map))
-        self.observation_space = spaces.Dict({
-            "image": spaces.Box(low=0, high=255, shape=(1, 144, 160), dtype=np.uint8),
-            "state": spaces.Box(low=-1.0, high=1.0, shape=(5,), dtype=np.float32) 
-        })
+        # macro_actions=True면 기본 액션 뒤에 game_manager.MACRO_ACTIONS를 이어 붙인 액션 공간을 씁니다.
+        self.macro_actions = macro_actions
+        num_actions = len(self.manager.action_map) + (len(MACRO_ACTIONS) if macro_actions else 0)
+        self.action_space = spaces.Discrete(num_actions)
+        state_space = spaces.Box(low=-1.0, high=1.0, shape=(STATE_VECTOR_SIZE,), dtype=np.float32)
+        # 탐험 기록: 맵별 256x256 방문 격자 (리셋 때 0으로 채워 재사용)
+        self.exploration = ExplorationMap()
+        # global_map=True면 방문한 타일을 ROM 맵 연결로 배치한 전역 캔버스에 그려 "explored" 관측으로 내보냅니다.
+        self.global_map = None
+        if global_map:
+            offsets = self.state_reader.rom_mapper.get_global_map_offsets()
+            self.global_map = GlobalExplorationCanvas(offsets, GLOBAL_MAP_SHAPE)
+        if obs_mode == 'tiles':
+            self.observation_space = spaces.Dict({
+                "tiles": spaces.Box(low=0, high=255, shape=(1, TILE_ROWS, TILE_COLS), dtype=np.uint8),
+                "sprites": spaces.Box(low=0, high=255, shape=(OAM_SPRITES, 4), dtype=np.uint8),
+                "state": state_space,
+            })
+        else:
+            self.observation_space = spaces.Dict({
+                "image": spaces.Box(low=0, high=255, shape=self.manager.screen_shape, dtype=np.uint8),
+                "state": state_space,
+            })
+        if self.global_map is not None:
+            self.observation_space.spaces["explored"] = spaces.Box(low=0, high=255, shape=(1, *GLOBAL_MAP_SHAPE), dtype=np.uint8)
+        # 관측 버퍼 (재사용)
+        self.observation_builder = ObservationBuilder(self.manager, self.state_reader, obs_mode, self.global_map)
         self.current_skill: Skill = LevelUpSkill(target_level=251) # 기본 스킬
         self.main_task: str = "Become the Johto Champion"
+        self.branches = {} # 스냅샷 핸들 -> snapshot() 시점의 에피소드 변수 (리셋 후에도 유지)
 
         self.init_state()
 
@@ -50,14 +104,18 @@ class PokemonGoldEnv(gym.Env):
         self.reward_log = {} # 보상 디버깅용
 
         # 탐험 보상을 위한 변수
-        self.seen_coords = {} # map_key -> set((x, y))
+        self.exploration.reset()
+        if self.global_map is not None:
+            self.global_map.reset()
         
         # 중복 보상을 막기 위한 변수
         self.max_party_level_sum = 0
         self.max_badges = 0
         self.completed_events = set()
+        self.explore_pending = True # 에피소드 첫 스텝은 위치가 안 바뀌어도 탐험 보상을 계산
 
         self.step_count = 0 # <<< 에피소드 스텝 카운터
+        self.step_timing = {} # 마지막 스텝의 구간별 소요 시간(초)과 갱신된 RAM 티어
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
@@ -66,7 +124,8 @@ class PokemonGoldEnv(gym.Env):
         # <<< 수정: reset 시 항상 초기 .state 파일 또는 최고 .state 파일을 사용하도록 설정
         # main loop에서 self.manager.state_path를 변경해주는 방식 사용
         self.manager.reset() 
-        self.current_state = self.state_reader.get_state_dict()
+        # 에피소드 경계: cold 티어까지 전부 갱신
+        self.current_state = self.state_reader.get_state_dict(refresh_tiers=REFRESH_TIERS)
 
         self.max_party_level_sum = self.current_state['party_info']['party_level_sum']
         self.max_badges = self.current_state['player_info']['johto_badges_count']
@@ -76,54 +135,76 @@ class PokemonGoldEnv(gym.Env):
         
         return self._get_observation(), self.current_state
     
+    def snapshot(self) -> int:
+        """
+        에뮬레이터 상태(GameManager 메모리 링)와 에피소드 변수를 저장하고 핸들을 반환합니다.
+        짧은 분기를 진행해 본 뒤 restore()로 되감는 탐색용입니다. (디스크를 쓰지 않음)
+        GameManager.snapshot()과 같이 PyBoy 1.x에서는 한 번에 step()보다 오래 걸리므로 분기 지점에서만 부르세요.
+        """
+        handle = self.manager.snapshot()
+        self.branches.pop(handle - self.manager.snapshot_slots, None)  # 링에서 덮어써진 핸들
+        self.branches[handle] = {
+            'step_count': self.step_count,
+            'exploration': self.exploration.copy(),
+            'global_map': self.global_map.canvas.copy() if self.global_map is not None else None,
+            'max_party_level_sum': self.max_party_level_sum,
+            'max_badges': self.max_badges,
+            'completed_events': set(self.completed_events),
+            'explore_pending': self.explore_pending,
+        }
+        return handle
+
+    def restore(self, handle: int):
+        """snapshot() 시점으로 되감고 (관측, 상태 dict)를 반환합니다. 같은 핸들로 여러 번 되감을 수 있습니다."""
+        if handle not in self.branches or not self.manager.has_snapshot(handle):
+            raise KeyError(f"스냅샷 {handle}이(가) 없거나 이미 덮어써졌습니다.")
+        self.manager.restore(handle)
+        saved = self.branches[handle]
+        self.step_count = saved['step_count']
+        self.exploration.restore_from(saved['exploration'])
+        if self.global_map is not None:
+            np.copyto(self.global_map.canvas, saved['global_map'])
+        self.max_party_level_sum = saved['max_party_level_sum']
+        self.max_badges = saved['max_badges']
+        self.completed_events = set(saved['completed_events'])
+        self.explore_pending = saved['explore_pending']
+        # 되감기 전과 RAM이 전혀 다를 수 있으므로 모든 티어를 갱신합니다.
+        self.current_state = self.state_reader.get_state_dict(refresh_tiers=REFRESH_TIERS)
+        return self._get_observation(), self.current_state
+
     def render(self, mode='rgb_array'):
         """환경의 현재 화면을 numpy 배열로 반환합니다."""
         # GameManager를 통해 현재 화면 이미지를 가져옴
         return self.manager.get_screen_image()
 
-    def _get_state_vector(self) -> np.ndarray:
-        """ RAM에서 읽은 주요 정보들을 정규화하여 벡터로 만듭니다. """
-        player_info = self.current_state.get('player_info', {})
-        location_info = self.current_state.get('location', {})
-        
-        # 좌표와 맵 ID는 학습 안정성을 위해 -1 ~ 1 사이 값으로 정규화
-        # 최대 맵 크기를 대략 255x255로 가정
-        x_coord = (location_info.get('x_coord', 0) / 128.0) - 1.0
-        y_coord = (location_info.get('y_coord', 0) / 128.0) - 1.0
-        map_bank = (location_info.get('map_bank', 0) / 128.0) - 1.0
-        map_id = (location_info.get('map_id', 0) / 128.0) - 1.0
-        
-        # 배지 개수는 0 ~ 1 사이 값으로 정규화 (최대 8개)
-        badges = player_info.get('johto_badges_count', 0) / 8.0
-        
-        return np.array([x_coord, y_coord, map_bank, map_id, badges], dtype=np.float32)
-
-    def _get_observation(self):
-        """ ✨ [핵심 수정 2] 관측 데이터를 Dict 형태로 조합하여 반환합니다. """
-        # VecFrameStack 래퍼는 Dict의 'image' 키에 자동으로 적용됩니다.
-        # 따라서 우리는 채널이 1인 단일 이미지만 제공하면 됩니다.
-        image_obs = np.transpose(self.manager.get_screen_image(), (2, 0, 1)) # HWC -> CHW
-        state_vec = self._get_state_vector()
-        
-        return {"image": image_obs.astype(np.uint8), "state": state_vec}
+    def _get_observation(self, out: dict = None) -> dict:
+        """
+        관측 dict를 반환합니다. ObservationBuilder가 미리 할당한 버퍼(image/tiles/state/explored)를 채워 그대로 돌려주므로
+        매 스텝 같은 배열입니다. (VecEnv가 복사/피클함) out을 주면 그 버퍼 dict에 바로 씁니다.
+        state는 RAM 스냅샷에서 바로 계산한 정규화 벡터 (x, y, map_bank, map_id, 배지 수)입니다.
+        """
+        return self.observation_builder.build(out)
 
-    def _get_auxiliary_rewards(self, prev_state: dict) -> float:
+    def _get_auxiliary_rewards(self, prev_state: dict, fired: frozenset = None) -> float:
         """
         항상 계산되는 보조적인 보상들을 계산합니다. (포켓몬 레드 프로젝트 아이디어 차용)
+        fired(이번 스텝에 바뀐 watch 이름들)가 주어지면 관련 바이트가 바뀐 요소만 계산합니다.
         """
         aux_reward = 0
-        loc = self.current_state['location']
-        map_key = f"{loc['map_bank']}_{loc['map_id']}"
-        coords = (loc['x_coord'], loc['y_coord'])
-        if map_key not in self.seen_coords:
-            self.seen_coords[map_key] = set()
-            aux_reward += 5.0
-        if coords not in self.seen_coords[map_key]:
-            self.seen_coords[map_key].add(coords)
-            aux_reward += 0.1
-        hp_lost = prev_state['party_info']['party_hp_sum'] - self.current_state['party_info']['party_hp_sum']
-        if hp_lost > 0:
-            aux_reward -= hp_lost * 0.01
+        if fired is None or 'location' in fired or self.explore_pending:
+            self.explore_pending = False
+            loc = self.current_state['location']
+            visited = self.exploration.visit(loc['map_bank'], loc['map_id'], loc['x_coord'], loc['y_coord'])
+            if visited & NEW_MAP:
+                aux_reward += 5.0
+            if visited & NEW_TILE:
+                aux_reward += 0.1
+                if self.global_map is not None:
+                    self.global_map.mark(loc['map_bank'], loc['map_id'], loc['x_coord'], loc['y_coord'])
+        if fired is None or 'party_hp' in fired:
+            hp_lost = prev_state['party_info']['party_hp_sum'] - self.current_state['party_info']['party_hp_sum']
+            if hp_lost > 0:
+                aux_reward -= hp_lost * 0.01
         if not prev_state.get('is_in_menu') and self.current_state.get('is_in_menu'):
             aux_reward -= 0.5  # 메뉴를 '새로 열 때' 큰 페널티 (START 버튼 억제)
         if prev_state.get('is_in_menu') and self.current_state.get('is_in_menu'):
@@ -155,81 +236,166 @@ class PokemonGoldEnv(gym.Env):
         return reward
     
     def step(self, action: int):
-        self.step_count += 1 # <<< 스텝 수 증가
-        prev_state = self.current_state
-        
-        self.manager.step(action)
-        self.current_state = self.state_reader.get_state_dict()
-        
+        """
+        기본 액션(0-7)은 1스텝, 매크로 액션은 종료 조건까지 여러 스텝(서브스텝)을 이 호출 안에서 진행합니다.
+        서브스텝마다 RAM 상태를 갱신해 보상을 누적하고 step_count를 올리므로 MAX_EPISODE_STEPS는 그대로 지켜집니다.
+        """
+        t0 = time.perf_counter()
+        timing = {'emulator': 0.0, 'state': 0.0, 'reward': 0.0}
+        num_buttons = len(self.manager.action_map)
+        macro = MACRO_ACTIONS[action - num_buttons] if action >= num_buttons else None
+        # 타일맵 관측은 화면 픽셀을 쓰지 않으므로 렌더링을 완전히 건너뜁니다.
+        render = self.obs_mode == 'pixels'
+
+        reward = 0.0
+        frames = 0
+        substeps = 0
+        stalled = 0
+        while True:
+            prev_state = self.current_state
+            ta = time.perf_counter()
+            if macro is None:
+                self.manager.step(action, frame_skip=self.frame_skip, render=render)
+                step_frames = 2 * self.frame_skip
+                if self.fast_forward_frames > 0:
+                    step_frames += self.manager.fast_forward(self.fast_forward_frames, self.fast_forward_settle, render=render)
+                changed = True
+            else:
+                step_frames, changed = self.manager.macro_step(macro[1], macro[3], frame_skip=self.frame_skip,
+                                                               settle_frames=self.fast_forward_settle, render=render)
+            frames += step_frames
+            substeps += 1
+            timing['emulator'] += time.perf_counter() - ta
+            step_reward, terminated, truncated = self._advance(prev_state, timing)
+            reward += step_reward
+
+            if macro is None or terminated or truncated or substeps >= macro[2]:
+                break
+            stalled = stalled + 1 if not self._moved(prev_state) else 0
+            if self._macro_done(macro[3], prev_state, changed, stalled):
+                break
+
+        t3 = time.perf_counter()
         obs = self._get_observation()
-        
-        if self.current_state['is_in_battle']:
-            main_reward = self._calculate_battle_reward(prev_state, self.current_state)
-        else:
-            main_reward = self.current_skill.get_reward(prev_state, self.current_state)
-            
-        aux_reward = self._get_auxiliary_rewards(prev_state)
+        if terminated or truncated:
+            # SubprocVecEnv는 terminal_observation으로 이 obs를 보관한 채 reset()을 호출하므로
+            # 재사용 버퍼가 덮어써지지 않도록 마지막 관측만 복사합니다.
+            obs = {key: value.copy() for key, value in obs.items()}
+        t4 = time.perf_counter()
 
-        reward = main_reward + aux_reward
+        self.step_timing = {
+            'emulator': timing['emulator'],
+            'state': timing['state'],
+            'observation': t4 - t3,
+            'reward': timing['reward'],
+            'total': t4 - t0,
+            'refreshed_tiers': self.state_reader.last_refreshed_tiers,
+            'frames': frames,
+            'substeps': substeps,
+        }
+        
+        info = self._get_info(terminated or truncated)
+        if self.fast_forward_frames > 0 or self.macro_actions:
+            info['frames'] = frames  # 이번 스텝에 진행한 에뮬레이터 프레임 수
+        if self.macro_actions:
+            info['substeps'] = substeps  # 이번 스텝이 소비한 에피소드 스텝 수
+        
+        return obs, reward, terminated, truncated, info
 
-        if prev_state['party_info']['party_hp_sum'] > 0 and self.current_state['party_info']['party_hp_sum'] == 0:
-            reward -= 50.0
+    def _advance(self, prev_state: dict, timing: dict) -> tuple[float, bool, bool]:
+        """
+        에뮬레이터를 1스텝 진행한 뒤 상태를 갱신하고 (보상, terminated, truncated)를 반환합니다.
+        timing의 'state'/'reward'에 구간별 소요 시간을 더합니다.
+        """
+        self.step_count += 1 # <<< 스텝 수 증가
 
-        # 종료 조건
         # 1. 파티가 전멸했을 때 - deleted
         terminated = False
         # 2. 최대 스텝 수를 초과했을 때 (Truncated)
         truncated = self.step_count >= MAX_EPISODE_STEPS
+
+        # 에피소드 마지막 스텝은 콜백이 읽는 info가 정확하도록 모든 티어를 갱신합니다.
+        t0 = time.perf_counter()
+        refresh_tiers = REFRESH_TIERS if (terminated or truncated) else None
+        self.current_state = self.state_reader.get_state_dict(refresh_tiers=refresh_tiers)
+        t1 = time.perf_counter()
         
-        info = self.current_state
-        
-        return obs, reward, terminated, truncated, info
+        # 이번 스텝에 바이트가 바뀐 watch들. 관련 구간이 그대로면 해당 보상 요소는 0이므로 건너뜁니다.
+        fired = self.state_reader.fired_watches
+        main_reward = 0.0
+        if self.current_state['is_in_battle']:
+            if 'battle' in fired or 'party_hp' in fired:
+                main_reward = self._calculate_battle_reward(prev_state, self.current_state)
+        else:
+            watches = self.current_skill.watches
+            if watches is None or not fired.isdisjoint(watches):
+                main_reward = self.current_skill.get_reward(prev_state, self.current_state)
+            
+        aux_reward = self._get_auxiliary_rewards(prev_state, fired)
 
-    def save_state(self, path: str):
-        """GameManager를 통해 현재 게임 상태를 저장합니다."""
-        self.manager.save_state(path)
+        reward = main_reward + aux_reward
 
-    def _get_rewards_dict(self, prev_state: dict) -> dict[str, float]:
-        """PokeRL 스타일로 보상 요소들을 개별적으로 계산하여 딕셔너리로 반환합니다."""
-        rewards = {}
-        
-        # 1. 이벤트 보상
-        event_reward = 0
-        for event, status in self.current_state['event_statuses'].items():
-            if status and event not in self.completed_events:
-                event_reward += 1
-                self.completed_events.add(event)
-        rewards['event'] = event_reward * REWARD_CONFIG['event']
+        if 'party_hp' in fired and prev_state['party_info']['party_hp_sum'] > 0 and self.current_state['party_info']['party_hp_sum'] == 0:
+            reward -= 50.0
+        timing['state'] += t1 - t0
+        timing['reward'] += time.perf_counter() - t1
+        return reward, terminated, truncated
 
-        # 2. 배지 보상
-        badge_reward = self.current_state['player_info']['johto_badges_count'] - self.max_badges
-        if badge_reward > 0:
-            self.max_badges = self.current_state['player_info']['johto_badges_count']
-        rewards['badge'] = badge_reward * REWARD_CONFIG['badge']
+    def _moved(self, prev_state: dict) -> bool:
+        """직전 서브스텝에서 플레이어 좌표가 바뀌었는지"""
+        prev_loc, loc = prev_state['location'], self.current_state['location']
+        return (prev_loc['x_coord'], prev_loc['y_coord']) != (loc['x_coord'], loc['y_coord'])
 
-        # 3. 레벨 보상
-        level_reward = self.current_state['party_level_sum'] - self.max_party_level_sum
-        if level_reward > 0:
-            self.max_party_level_sum = self.current_state['party_level_sum']
-        rewards['level_up'] = level_reward * REWARD_CONFIG['level_up']
+    def _macro_done(self, until: str, prev_state: dict, changed: bool, stalled: int) -> bool:
+        """매크로 액션의 종료 조건 (changed: 이번 서브스텝에 화면/입력 대기 RAM이 바뀌었는지)"""
+        if until == 'walk':
+            # 첫 입력은 방향 전환에 쓰일 수 있으므로 두 번 연속 제자리면 막힌 것으로 봅니다.
+            # 맵 이동, 전투 시작, 메뉴/대사가 열리면 중단합니다.
+            prev_loc, loc = prev_state['location'], self.current_state['location']
+            return (stalled >= 2 or self.current_state['is_in_battle'] or self.current_state['is_in_menu']
+                    or (prev_loc['map_bank'], prev_loc['map_id']) != (loc['map_bank'], loc['map_id']))
+        if until == 'menu_closed':
+            return not changed or not self.current_state['is_in_menu']
+        return not changed
 
-        # 4. 탐험 보상
-        loc = self.current_state['location']
-        map_key = f"{loc['map_bank']}_{loc['map_id']}"
-        coords = (loc['x_coord'], loc['y_coord'])
-        
-        if map_key not in self.seen_coords:
-            self.seen_coords[map_key] = set()
-            rewards['new_map'] = REWARD_CONFIG['new_map']
-        
-        if coords not in self.seen_coords[map_key]:
-            self.seen_coords[map_key].add(coords)
-            rewards['exploration'] = REWARD_CONFIG['exploration']
+    def _get_info(self, done: bool) -> dict:
+        """step()의 info. SubprocVecEnv 파이프로 매 스텝 피클되므로 info_mode에 따라 필요한 만큼만 보냅니다."""
+        mode = self.info_mode
+        if mode == 'full':
+            return self.current_state
+        if mode == 'none':
+            return {}
+        if mode == 'summary':
+            return self._get_summary()
+        if mode == 'episode_end':
+            return dict(self.current_state) if done else {}
+        compact = self.state_reader.get_compact_state()
+        if not done:
+            return {'compact_state': compact}
+        info = dict(self.current_state)
+        info['compact_state'] = compact
+        return info
 
-        # 5. HP 감소 페널티
-        hp_penalty = self.current_state['party_info']['party_hp_sum'] - prev_state['party_info']['party_hp_sum']
-        if hp_penalty < 0:
-            rewards['hp_penalty'] = hp_penalty * REWARD_CONFIG['hp_penalty']
+    def _get_summary(self) -> dict:
+        """info_mode='summary'용 스칼라 요약"""
+        loc = self.current_state['location']
+        party_info = self.current_state['party_info']
+        player_info = self.current_state['player_info']
+        return {
+            'map_bank': loc['map_bank'],
+            'map_id': loc['map_id'],
+            'x_coord': loc['x_coord'],
+            'y_coord': loc['y_coord'],
+            'johto_badges_count': player_info['johto_badges_count'],
+            'money': player_info['money'],
+            'party_level_sum': party_info['party_level_sum'],
+            'party_hp_sum': party_info['party_hp_sum'],
+            'is_in_battle': self.current_state['is_in_battle'],
+            'events_completed': sum(self.current_state['event_statuses'].values()),
+            'tiles_seen': self.exploration.tiles_seen,
+            'maps_seen': self.exploration.maps_seen,
+        }
 
-        # 0이 아닌 보상만 필터링하여 반환
-        return {k: v for k, v in rewards.items() if v != 0}
\ No newline at end of file
+    def save_state(self, path: str):
+        """GameManager를 통해 현재 게임 상태를 저장합니다."""
+        self.manager.save_state(path)
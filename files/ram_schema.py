@@ -0,0 +1,88 @@
+# ram_schema.py
+"""
+game_state.py의 주소 테이블(주소/오프셋 + 형식)을 NumPy structured dtype으로 컴파일하는 스키마 레이어.
+컴파일된 dtype으로 WRAM 블록 전체를 np.frombuffer 한 번에 디코딩합니다.
+"""
+import numpy as np
+
+# --- 필드 형식 ---
+U8 = 'u1'
+U16_BE = '>u2'              # 빅엔디안 2바이트 (HP, 스탯 등)
+U16_LE = '<u2'              # 리틀엔디안 2바이트 (플레이어 ID)
+U24_BE = ('u1', (3,))       # 3바이트 빅엔디안 (경험치) -> be_uint()로 후처리
+BCD3 = ('u1', (3,))         # 3바이트 BCD (돈) -> bcd_to_int()로 후처리
+NIBBLES = 'u1'              # 상/하위 4비트 쌍 (개체값) -> split_nibbles()로 후처리
+ITEM_SLOT = np.dtype([('id', 'u1'), ('amount', 'u1')])
+
+
+def u8_array(length: int) -> tuple:
+    """length 바이트짜리 u1 배열 필드 형식"""
+    return ('u1', (length,))
+
+
+def compile_record_dtype(offsets: dict, formats: dict, base: int = 0, itemsize: int = None) -> np.dtype:
+    """
+    주소(또는 오프셋) 테이블과 형식 테이블을 structured dtype으로 컴파일합니다.
+    formats에 있는 필드만 포함되며, 오프셋은 offsets[name] - base 입니다.
+    """
+    names, fmts, offs = [], [], []
+    for name, fmt in formats.items():
+        names.append(name)
+        fmts.append(fmt)
+        offs.append(offsets[name] - base)
+    end = max(off + np.dtype(fmt).itemsize for off, fmt in zip(offs, fmts))
+    return np.dtype({
+        'names': names,
+        'formats': fmts,
+        'offsets': offs,
+        'itemsize': end if itemsize is None else itemsize,
+    })
+
+
+def record_byte_ranges(dtype: np.dtype, base: int, count: int = 1, fields=None) -> list[tuple[int, int]]:
+    """
+    dtype의 각 필드가 차지하는 절대 주소 구간 [start, end) 목록 (스냅샷 영역 계산용)
+    fields를 주면 해당 필드들만 포함합니다.
+    """
+    ranges = []
+    for i in range(count):
+        record_base = base + i * dtype.itemsize
+        for name in (dtype.names if fields is None else fields):
+            field_dtype, offset = dtype.fields[name][:2]
+            ranges.append((record_base + offset, record_base + offset + field_dtype.itemsize))
+    return merge_ranges(ranges)
+
+
+def merge_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """겹치거나 맞닿은 구간을 합칩니다."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+# --- 후처리 디코더 (벡터화) ---
+def be_uint(raw: np.ndarray) -> np.ndarray:
+    """마지막 축의 바이트들을 빅엔디안 정수로 합칩니다. (예: 3바이트 경험치)"""
+    value = np.zeros(raw.shape[:-1], dtype=np.int64)
+    for i in range(raw.shape[-1]):
+        value = (value << 8) | raw[..., i]
+    return value
+
+
+def bcd_to_int(raw: np.ndarray) -> np.ndarray:
+    """마지막 축의 BCD 바이트들을 10진 정수로 변환합니다."""
+    raw = raw.astype(np.int64)
+    digits = (raw >> 4) * 10 + (raw & 0x0F)
+    value = np.zeros(raw.shape[:-1], dtype=np.int64)
+    for i in range(raw.shape[-1]):
+        value = value * 100 + digits[..., i]
+    return value
+
+
+def split_nibbles(raw: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """바이트를 (상위 4비트, 하위 4비트)로 나눕니다."""
+    return (raw >> 4) & 0x0F, raw & 0x0F
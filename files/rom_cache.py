@@ -0,0 +1,42 @@
+# rom_cache.py
+"""ROM 해시를 키로 하는 디스크 캐시 헬퍼 (여러 SubprocVecEnv 워커가 같은 캐시를 공유)"""
+import hashlib
+import os
+import tempfile
+
+CACHE_DIR_NAME = ".pokemon_cache"
+
+
+def rom_digest(rom_data: bytes) -> str:
+    """ROM 바이트의 SHA-1 해시 (캐시 키)"""
+    return hashlib.sha1(rom_data).hexdigest()
+
+
+def rom_file_digest(rom_path: str) -> str:
+    """ROM 파일을 읽어 SHA-1 해시를 계산합니다."""
+    with open(rom_path, 'rb') as f:
+        return rom_digest(f.read())
+
+
+def cache_path(rom_path: str, digest: str, name: str) -> str:
+    """ROM 파일 옆 캐시 폴더 안의 '{name}_{digest 앞 16자리}' 경로를 반환합니다."""
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(rom_path)), CACHE_DIR_NAME)
+    base, ext = os.path.splitext(name)
+    return os.path.join(cache_dir, f"{base}_{digest[:16]}{ext}")
+
+
+def atomic_write(path: str, write_fn):
+    """
+    임시 파일에 write_fn(file)로 쓴 뒤 os.replace로 교체합니다.
+    여러 워커가 동시에 써도 읽는 쪽은 완성된 파일만 보게 됩니다.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write_fn(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -7,6 +7,11 @@ from game_state import GameState, EVENT_FLAGS
 # ==============================================================================
 class Skill:
     """모든 스킬의 기본이 되는 추상 클래스"""
+    # get_reward()가 의존하는 GameState watch 이름들 (game_state.WATCH_RANGES).
+    # 이 구간들이 바뀌지 않은 스텝에는 보상이 0이므로 계산을 건너뜁니다. None이면 매 스텝 계산.
+    # get_reward()를 재정의하는 스킬은 is_achieved()가 아니라 재정의한 보상이 읽는 값을 기준으로 정해야 합니다.
+    watches = None
+
     def __init__(self, description: str):
         self.description = description
 
@@ -26,6 +31,8 @@ class Skill:
 
 class GoToMapSkill(Skill):
     """특정 맵으로 이동하는 스킬"""
+    watches = ('location',)
+
     def __init__(self, map_bank: int, map_id: int, map_name: str):
         super().__init__(f"{map_name}(으)로 이동하기")
         self.map_bank = map_bank
@@ -37,6 +44,8 @@ class GoToMapSkill(Skill):
 
 class DefeatGymLeaderSkill(Skill):
     """체육관 관장을 이기고 배지를 획득하는 스킬"""
+    watches = ('badges',)
+
     def __init__(self, badge_name: str, target_badge_count: int):
         super().__init__(f"{badge_name} 배지 획득하기 ({target_badge_count}번째)")
         self.target_badge_count = target_badge_count
@@ -46,6 +55,8 @@ class DefeatGymLeaderSkill(Skill):
 
 class CompleteEventFlagSkill(Skill):
     """특정 이벤트 플래그를 달성하는 스킬 (가장 일반적인 스토리 진행)"""
+    watches = ('event_flags',)
+
     def __init__(self, event_name: str, description: str):
         super().__init__(description)
         self.event_name = event_name
@@ -55,6 +66,8 @@ class CompleteEventFlagSkill(Skill):
 
 class ObtainItemSkill(Skill):
     """특정 아이템을 획득하는 스킬"""
+    watches = ('bag',)
+
     def __init__(self, item_id: int, item_name: str, item_type: str = 'items'):
         super().__init__(f"{item_name} 획득하기")
         self.item_id = item_id
@@ -69,6 +82,8 @@ class ObtainItemSkill(Skill):
 
 class CapturePokemonSkill(Skill):
     """특정 포켓몬을 포획하는 스킬"""
+    watches = ('party',)
+
     def __init__(self, species_id: int, species_name: str):
         super().__init__(f"{species_name} 포획하기")
         self.species_id = species_id
@@ -79,6 +94,8 @@ class CapturePokemonSkill(Skill):
 
 class LevelUpSkill(Skill):
     """파티 포켓몬의 레벨을 올리는 스킬"""
+    watches = ('party',)
+
     def __init__(self, target_level: int):
         super().__init__(f"파티 포켓몬 중 하나의 레벨을 {target_level} 이상으로 올리기")
         self.target_level = target_level
@@ -167,6 +184,9 @@ AVAILABLE_SKILLS = [
 ]
 
 class HealPartySkill(Skill):
+    # get_reward()가 목표 맵 밖에서는 매 스텝 -0.1을 주므로 게이트하지 않습니다.
+    watches = None
+
     def __init__(self, heal_location: dict):
         super().__init__(f"{heal_location['name']}에서 파티 회복하기")
         self.heal_location = heal_location
@@ -0,0 +1,52 @@
+# test_compact_state.py
+"""CompactState(IPC 요약 레코드 접근자)의 copy/pickle 왕복 테스트"""
+import copy
+import os
+import pickle
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_state import COMPACT_STATE_DTYPE, CompactState  # noqa: E402
+
+
+def make_state() -> CompactState:
+    record = np.zeros(1, dtype=COMPACT_STATE_DTYPE)
+    record['map_bank'] = 24
+    record['map_id'] = 4
+    record['money'] = 123456
+    record['party_count'] = 2
+    record['party_hp_sum'] = 70000
+    record['is_in_battle'] = 1
+    record['enemy_species'] = 16
+    record['event_bits'][0, 0] = 0b101
+    return CompactState(record.tobytes())
+
+
+def assert_same(restored: CompactState, original: CompactState):
+    assert type(restored) is CompactState
+    assert restored.record.tobytes() == original.record.tobytes()
+    assert restored.map_bank == 24
+    assert restored.money == 123456
+    assert restored.party_hp_sum == 70000
+    assert restored.to_state_dict() == original.to_state_dict()
+
+
+def test_copy_round_trip():
+    state = make_state()
+    assert_same(copy.copy(state), state)
+    assert_same(copy.deepcopy(state), state)
+
+
+def test_pickle_round_trip():
+    state = make_state()
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        assert_same(pickle.loads(pickle.dumps(state, protocol=protocol)), state)
+
+
+def test_unknown_attribute_raises():
+    state = make_state()
+    assert not hasattr(state, 'no_such_field')
+    assert not hasattr(CompactState.__new__(CompactState), 'map_id')
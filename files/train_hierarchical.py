@@ -4,13 +4,15 @@ import json
 from sb3_contrib import RecurrentPPO 
 from stable_baselines3.common.vec_env import SubprocVecEnv
 from pokemon_env import PokemonGoldEnv
+from game_state import RefreshPolicy
 from llm_planner import LLMPlanner
 from skill_library import AVAILABLE_SKILLS, HealPartySkill
 from task_manager import TaskManager
 from callbacks import EpisodeLogCallback, BestAgentCallback, ImageLogCallback
-from custom_policy import CombinedExtractor
+from custom_policy import CombinedExtractor, TileMapExtractor
 from concurrent.futures import ThreadPoolExecutor
 from custom_wrappers import VecDictFrameStack
+from custom_buffers import use_frame_dedup_buffer
 
 # --- 하이퍼파라미터 ---
 ROM_PATH = "PokemonGold.gbc"
@@ -22,6 +24,18 @@ MODEL_SAVE_PATH = 'trained_models'
 LOG_DIR = 'logs'
 NUM_ENVS = 8
 SYNC_INTERVAL = 10 
+OBS_MODE = 'pixels'       # 'tiles'면 화면 렌더링 없이 타일 ID 격자 + 스프라이트 테이블 관측 (TileMapExtractor)
+SCREEN_DOWNSAMPLE = 1     # 2면 72x80 관측 (롤아웃 버퍼/CNN 비용 1/4). 저장된 모델과 관측 크기가 같아야 합니다.
+SCREEN_CROP = None        # (위, 아래, 왼쪽, 오른쪽) 잘라낼 픽셀 수
+FAST_FORWARD_FRAMES = 0   # >0이면 대사/애니메이션 중에는 입력 대기 상태까지 최대 이 프레임만큼 자동 진행
+FAST_OPTIONS = True       # 리셋 때마다 게임 옵션을 글자 속도 '빠르게', 전투 애니메이션 '끄기'로 고정
+MACRO_ACTIONS = False     # True면 '4타일 걷기', 'A 연타', '메뉴 닫기' 매크로 액션 추가 (액션 수가 바뀌므로 저장된 모델과 호환되지 않음)
+GLOBAL_MAP = False        # True면 방문 타일을 전역 맵 캔버스로 그린 "explored" 관측 추가 (관측 공간이 바뀌므로 저장된 모델과 호환되지 않음)
+FRAME_STACK = 4
+DEDUP_ROLLOUT_FRAMES = True         # 롤아웃 버퍼에 스택 대신 프레임을 한 번씩만 저장 (이미지 메모리 약 1/4, 샘플은 동일)
+COLLAPSE_DUPLICATE_FRAMES = False   # True면 직전과 똑같은 프레임(대사 창, 정지 화면)도 한 번만 저장
+INFO_MODE = 'compact'     # step() info 형식 (pokemon_env.INFO_MODES). 콜백은 종료 스텝에서만 읽습니다.
+STATE_WARM_INTERVAL = 16  # 배지/가방/이벤트 플래그 RAM 갱신 주기 (맵 이동, 전투 시작/종료 때는 즉시 갱신)
 
 POKEMON_CENTERS = [
     {'name': 'new bark town', 'map_bank': 24, 'map_id': 5, 'x': 2, 'y': 2},
@@ -52,11 +66,28 @@ def make_env(rank: int, state_path: str):
         env = PokemonGoldEnv(
             rom_path=ROM_PATH, 
             state_path=state_path, 
-            render_mode='rgb_array'
+            render_mode='rgb_array',
+            refresh_policy=RefreshPolicy.tiered(warm_interval=STATE_WARM_INTERVAL),
+            info_mode=INFO_MODE,
+            screen_downsample=SCREEN_DOWNSAMPLE,
+            screen_crop=SCREEN_CROP,
+            obs_mode=OBS_MODE,
+            fast_forward_frames=FAST_FORWARD_FRAMES,
+            fast_options=FAST_OPTIONS,
+            macro_actions=MACRO_ACTIONS,
+            global_map=GLOBAL_MAP,
         )
         return env
     return _init
 
+def detach_last_obs(model):
+    """
+    VecDictFrameStack의 관측은 다음 스텝에 덮어써지는 프레임 버퍼 뷰입니다.
+    두 모델이 같은 vec_env를 번갈아 쓰므로, 학습을 마친 모델이 다음 learn()에서 이어 쓸 마지막 관측은 복사해 둡니다.
+    """
+    if isinstance(model._last_obs, dict):
+        model._last_obs = {key: value.copy() for key, value in model._last_obs.items()}
+
 def main():
     os.makedirs(MODEL_SAVE_PATH, exist_ok=True)
     os.makedirs(LOG_DIR, exist_ok=True)
@@ -77,7 +108,8 @@ def main():
     image_callback = ImageLogCallback(frame_interval=1024)
 
     vec_env = SubprocVecEnv([make_env(i, INITIAL_STATE_PATH) for i in range(NUM_ENVS)])
-    vec_env = VecDictFrameStack(vec_env, n_stack=4, dict_obs_key="image")
+    stack_key = "tiles" if OBS_MODE == 'tiles' else "image"
+    vec_env = VecDictFrameStack(vec_env, n_stack=FRAME_STACK, dict_obs_key=stack_key)
 
     planner = LLMPlanner()
     task_manager = TaskManager(plan_path=PLAN_PATH)
@@ -86,7 +118,7 @@ def main():
     battle_model_to_load = best_battle_model_path if os.path.exists(best_battle_model_path) else os.path.join(MODEL_SAVE_PATH, "battle_ppo_model.zip")
 
     policy_kwargs = {
-        "features_extractor_class": CombinedExtractor,
+        "features_extractor_class": TileMapExtractor if OBS_MODE == 'tiles' else CombinedExtractor,
     }
 
     if os.path.exists(nav_model_to_load):
@@ -118,6 +150,9 @@ def main():
             tensorboard_log=LOG_DIR, 
             n_steps=STEPS_PER_SEGMENT
         )
+    if DEDUP_ROLLOUT_FRAMES:
+        for model in (nav_model, battle_model):
+            use_frame_dedup_buffer(model, stack_key, FRAME_STACK, collapse_duplicates=COLLAPSE_DUPLICATE_FRAMES)
     vec_env.reset()
     initial_info = vec_env.get_attr('current_state')[0]
     task_manager.sync_with_initial_state(initial_info)
@@ -182,6 +217,8 @@ def main():
             tb_log_name="RecurrentPPO",
             callback=[log_callback, best_agent_callback, image_callback],
         )
+        # 다음 세그먼트에서 다른 모델이 vec_env를 진행해도 이 모델의 마지막 관측이 깨지지 않도록 복사합니다.
+        detach_last_obs(current_model)
         total_steps += STEPS_PER_SEGMENT
         
         print(f"총 진행 스텝: {total_steps}/{TOTAL_TRAINING_STEPS} (세그먼트: {segment_count})")